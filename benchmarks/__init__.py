@@ -0,0 +1,3 @@
+"""
+Benchmarks of shacl2md, see `python -m benchmarks --help`.
+"""
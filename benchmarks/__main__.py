@@ -0,0 +1,117 @@
+"""
+Benchmarks of the phases of a shacl2md build on a synthetic model.
+
+    python -m benchmarks synth out/ [--shapes 100 --properties 5 ...]
+    python -m benchmarks run [--out results.json] [--repeat 5] [--phase parse ...]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.10]
+
+`compare` exits with status 1 when a phase is slower than the baseline by
+more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+MODEL_OPTIONS = {
+    "graphs": (2, "number of SHACL files"),
+    "shapes": (100, "number of node shapes per SHACL file"),
+    "properties": (5, "number of property shapes per node shape"),
+    "depth": (4, "number of levels of the subclass hierarchies"),
+    "langs": (3, "number of languages"),
+    "seed": (1, "seed of the random choices"),
+}
+
+
+def _add_model_options(parser: argparse.ArgumentParser):
+    for name, (default, help) in MODEL_OPTIONS.items():
+        parser.add_argument(f"--{name}", type=int, default=default, help=help)
+
+
+def _model(args: argparse.Namespace) -> dict:
+    return {name: getattr(args, name) for name in MODEL_OPTIONS}
+
+
+def synth(args: argparse.Namespace):
+    from benchmarks.synthetic import write_model
+
+    paths = write_model(args.output_dir, **_model(args))
+    print(paths["ontology"])
+    for path in paths["shacls"].values():
+        print(path)
+
+
+def run(args: argparse.Namespace):
+    from benchmarks.phases import run
+
+    results = run(args.repeat, args.phase, args.work_dir, **_model(args))
+    print(f"{'phase':<22} {'median':>10} {'min':>10}")
+    for name, timing in results["phases"].items():
+        print(f"{name:<22} {timing['median_ms']:>8.1f}ms {timing['min_ms']:>8.1f}ms")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+def compare(args: argparse.Namespace):
+    from benchmarks.phases import compare
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    if base["model"] != new["model"]:
+        print("warning: the results are of different models", file=sys.stderr)
+
+    comparisons = compare(base, new, args.threshold, args.min_ms)
+    print(f"{'phase':<22} {'base':>10} {'new':>10} {'change':>8}")
+    for c in comparisons:
+        print(
+            f"{c['phase']:<22} {c['base_ms']:>8.1f}ms {c['new_ms']:>8.1f}ms {c['ratio'] - 1:>+8.1%}"
+            + ("  REGRESSION" if c["regression"] else "")
+        )
+    sys.exit(1 if any(c["regression"] for c in comparisons) else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.strip().splitlines()[0]
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    synth_parser = subparsers.add_parser("synth", help="write a synthetic model")
+    synth_parser.add_argument("output_dir")
+    _add_model_options(synth_parser)
+    synth_parser.set_defaults(func=synth)
+
+    run_parser = subparsers.add_parser("run", help="measure the phases of a build")
+    run_parser.add_argument("--out", help="write the results to this JSON file")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument(
+        "--phase", action="append", help="only measure this phase, can be repeated"
+    )
+    run_parser.add_argument(
+        "--work_dir", help="directory for the model and the generated files"
+    )
+    _add_model_options(run_parser)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare results to a baseline"
+    )
+    compare_parser.add_argument("base", help="JSON results of the baseline")
+    compare_parser.add_argument("new", help="JSON results to compare")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.10, help="relative slowdown that fails"
+    )
+    compare_parser.add_argument(
+        "--min_ms", type=float, default=1.0, help="slowdowns below this are noise"
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
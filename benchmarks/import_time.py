@@ -0,0 +1,67 @@
+"""
+Benchmark of the time it takes to import shacl2md.
+
+Every import runs in a fresh interpreter. The script fails when importing
+`shacl2md` or its CLI loads one of the heavy dependencies, which should
+only be imported when they are used.
+
+    python benchmarks/import_time.py [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = ["shacl2md", "shacl2md.cli", "shacl2md.generator"]
+
+# Modules that must not be loaded by `import shacl2md` and the CLI.
+HEAVY_MODULES = ["rdflib", "jinja2", "pyshacl", "lxml", "requests", "tqdm"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": duration,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            check=True,
+            stdout=subprocess.PIPE,
+        ).stdout
+        runs.append(json.loads(output))
+    return {
+        "module": module,
+        "median_ms": statistics.median(run["seconds"] for run in runs) * 1000,
+        "heavy": runs[0]["heavy"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<22} {'median':>10}  heavy modules loaded")
+    for module in MODULES:
+        result = measure(module, args.repeat)
+        print(
+            f"{result['module']:<22} {result['median_ms']:>8.1f}ms  {', '.join(result['heavy']) or '-'}"
+        )
+        if module != "shacl2md.generator" and result["heavy"]:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
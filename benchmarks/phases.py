@@ -0,0 +1,252 @@
+"""
+Benchmarks of the phases of a shacl2md build, on a synthetic model.
+
+Every phase prepares its input outside the measurement, so a phase only
+measures its own work:
+
+    parse              parse the ontology and SHACL files with rdflib
+    extract            extract the language-neutral models, see ShaclModel
+    queries            run the prepared SPARQL queries on every graph, see prepared_query
+    queries_text       run the same queries as text, parsed and translated at every call
+    crosslink          index the classes of all graphs, see ClassIndex
+    classes            build the classes of every page and convert them for the templates
+    templates          render the pages, the Mermaid and the PlantUML diagrams
+    serialize_<format> serialize the graphs next to the pages
+    snippets           generate the VS Code snippets
+    generate           generate the documentation end to end, without diagrams
+"""
+import logging
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import jinja2
+import rdflib
+from rdflib.graph import Graph
+
+from benchmarks.synthetic import languages, write_model
+from shacl2md.generator import RDF_FORMATS, ShaclGraph, ShaclMarkdownGenerator
+from shacl2md.utilities.queries import QUERIES, prepared_query
+from shacl2md.utilities.rdf import ClassIndex, ClassRegistry, ShaclModel
+
+# Keeps the generators quiet, their messages are not part of the results
+_logger = logging.getLogger("shacl2md.benchmarks")
+_logger.addHandler(logging.NullHandler())
+_logger.propagate = False
+
+
+class Phase:
+    def __init__(self, name: str, setup: Callable[[], object], run: Callable[[object], None]):
+        """
+        A measured phase of a build.
+
+        Args:
+            name (str): Name of the phase.
+            setup (Callable): Prepares the input of a single run, not measured.
+            run (Callable): The measured work, called with the result of setup.
+        """
+        self.name: str = name
+        self.setup = setup
+        self.run = run
+
+    def measure(self, repeat: int) -> dict:
+        seconds = []
+        for _ in range(repeat):
+            state = self.setup()
+            start = time.perf_counter()
+            self.run(state)
+            seconds.append(time.perf_counter() - start)
+        return {
+            "median_ms": statistics.median(seconds) * 1000,
+            "min_ms": min(seconds) * 1000,
+            "runs": repeat,
+        }
+
+
+class Benchmark:
+    def __init__(self, work_dir: str, **model):
+        """
+        The phases of a build of a synthetic model, see synthetic.write_model.
+
+        Args:
+            work_dir (str): Directory for the model and the generated files.
+            **model: The parameters of the synthetic model.
+        """
+        self.work_dir: str = work_dir
+        self.model: dict = model
+        self.paths: dict = write_model(os.path.join(work_dir, "model"), **model)
+        self.languages: List[str] = languages(model.get("langs", 3))
+        self.output_dir: str = os.path.join(work_dir, "output")
+        # the generator of the phases after parsing, loaded once
+        self.generator: ShaclMarkdownGenerator = self._generator("mermaid")
+        self.generator.load_shacl_graphs(**self.paths["shacls"])
+
+    def _generator(self, diagram_backend: str) -> ShaclMarkdownGenerator:
+        return ShaclMarkdownGenerator(
+            languages=self.languages,
+            output_dir=self.output_dir,
+            crosslink_between_graphs=True,
+            ontology_graphs=[self.paths["ontology"]],
+            logger=_logger,
+            diagram_backend=diagram_backend,
+        )
+
+    def _pages(self) -> List[ShaclGraph]:
+        # fresh pages, their namespaces can only be iterated once
+        self.generator.class_registry = ClassRegistry()
+        return [
+            ShaclGraph(name, lang, self.generator)
+            for name in self.generator.graphs
+            for lang in self.languages
+        ]
+
+    def _parse(self, _):
+        Graph(bind_namespaces="none").parse(self.paths["ontology"])
+        for path in self.paths["shacls"].values():
+            Graph(bind_namespaces="none").parse(path)
+
+    def _extract(self, _):
+        for name, graph in self.generator.graphs.items():
+            ShaclModel(name, graph, self.generator.ontology_graph)
+
+    def _queries(self, _):
+        for model in self.generator.models.values():
+            for name in QUERIES:
+                list(model.view.query(prepared_query(name)))
+
+    def _queries_text(self, _):
+        for model in self.generator.models.values():
+            for query in QUERIES.values():
+                list(model.view.query(query))
+
+    def _crosslink(self, _):
+        ClassIndex(self.generator.models.values(), self.languages)
+
+    def _classes(self, pages: List[ShaclGraph]):
+        for page in pages:
+            page.class_dicts
+
+    def _templates_setup(self) -> List[ShaclGraph]:
+        pages = self._pages()
+        self._classes(pages)
+        return pages
+
+    def _templates(self, pages: List[ShaclGraph]):
+        for page in pages:
+            for _ in page.stream_md(page.render_diagram(), rdf_filename="shacl.ttl"):
+                pass
+            page.write_puml()
+
+    def _serialize(self, rdf_format: str) -> Callable[[object], None]:
+        def run(_):
+            for model in self.generator.models.values():
+                model.view.serialize(format=rdf_format, encoding="utf-8")
+
+        return run
+
+    def _snippets(self, pages: List[ShaclGraph]):
+        for page in pages:
+            page.generate_vscode_snippet()
+
+    def _generate_setup(self) -> ShaclMarkdownGenerator:
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+        return self._generator("none")
+
+    def _generate(self, generator: ShaclMarkdownGenerator):
+        generator.generate(**self.paths["shacls"])
+
+    def phases(self) -> List[Phase]:
+        return [
+            Phase("parse", lambda: None, self._parse),
+            Phase("extract", lambda: None, self._extract),
+            Phase("queries", lambda: None, self._queries),
+            Phase("queries_text", lambda: None, self._queries_text),
+            Phase("crosslink", lambda: None, self._crosslink),
+            Phase("classes", self._pages, self._classes),
+            Phase("templates", self._templates_setup, self._templates),
+            *(
+                Phase(f"serialize_{rdf_format}", lambda: None, self._serialize(rdf_format))
+                for rdf_format in RDF_FORMATS
+            ),
+            Phase("snippets", self._pages, self._snippets),
+            Phase("generate", self._generate_setup, self._generate),
+        ]
+
+
+def run(
+    repeat: int = 5,
+    phases: Optional[List[str]] = None,
+    work_dir: Optional[str] = None,
+    **model,
+) -> dict:
+    """
+    Measure the phases of a build of a synthetic model.
+
+    Args:
+        repeat (int, optional): Number of runs per phase. Defaults to 5.
+        phases (List[str], optional): Names of the phases to measure. Defaults to None, all phases.
+        work_dir (str, optional): Directory for the model and the generated files. Defaults to None, a temporary directory.
+        **model: The parameters of the synthetic model, see synthetic.write_model.
+
+    Returns:
+        dict: The environment, the model and the timings per phase.
+    """
+    temporary_dir = None
+    if work_dir is None:
+        temporary_dir = work_dir = tempfile.mkdtemp(prefix="shacl2md-benchmarks-")
+    try:
+        benchmark = Benchmark(work_dir, **model)
+        results: Dict[str, dict] = {}
+        for phase in benchmark.phases():
+            if phases and phase.name not in phases:
+                continue
+            results[phase.name] = phase.measure(repeat)
+    finally:
+        if temporary_dir is not None:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "rdflib": rdflib.__version__,
+            "jinja2": jinja2.__version__,
+            "machine": platform.machine(),
+        },
+        "model": model,
+        "phases": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float = 0.10, min_ms: float = 1.0) -> List[dict]:
+    """
+    Compare the results of two runs, phase by phase.
+
+    Args:
+        base (dict): The baseline results, see run.
+        new (dict): The new results.
+        threshold (float, optional): Relative slowdown of the median that is a regression. Defaults to 0.10.
+        min_ms (float, optional): Slowdowns of fewer milliseconds are noise, not regressions. Defaults to 1.0.
+
+    Returns:
+        List[dict]: The comparison of every phase of both runs.
+    """
+    comparisons = []
+    for name, timing in new["phases"].items():
+        if name not in base["phases"]:
+            continue
+        base_ms = base["phases"][name]["median_ms"]
+        new_ms = timing["median_ms"]
+        ratio = new_ms / base_ms if base_ms else float("inf")
+        comparisons.append(
+            {
+                "phase": name,
+                "base_ms": base_ms,
+                "new_ms": new_ms,
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold and new_ms - base_ms >= min_ms,
+            }
+        )
+    return comparisons
@@ -0,0 +1,158 @@
+"""
+Synthetic SHACL and ontology files for the benchmarks.
+
+A model has `graphs` SHACL files with `shapes` node shapes each, every node
+shape has `properties` property shapes. The property shapes cycle through
+datatypes, classes of the same or another graph (crosslinks), `sh:or` lists
+with a nested `sh:or`, `sh:in` enumerations and IRIs. The target classes form
+subclass hierarchies of `depth` levels and are labelled in `languages`
+languages in a shared ontology file. The model is deterministic for a seed.
+"""
+import os
+import random
+from typing import List
+
+LANGUAGES = ["en", "nl", "fr", "de", "es", "it", "pt", "da", "sv", "fi"]
+
+PREFIXES = """@prefix dct: <http://purl.org/dc/terms/> .
+@prefix ex: <http://example.org/ns#> .
+@prefix exs: <http://example.org/shapes#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix pav: <http://purl.org/pav/> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix schema: <https://schema.org/> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+"""
+
+DATATYPES = ["xsd:string", "xsd:integer", "xsd:date", "xsd:boolean", "xsd:anyURI"]
+
+# number of values of an sh:in enumeration
+ENUMERATION_SIZE = 5
+
+
+def languages(count: int) -> List[str]:
+    """
+    Get the language codes of a model, e.g., ["en", "nl"] for 2.
+
+    Args:
+        count (int): Number of languages.
+    """
+    return (LANGUAGES + [f"l{i}" for i in range(len(LANGUAGES), count)])[:count]
+
+
+def _literals(predicate: str, text: str, langs: List[str]) -> str:
+    return f"{predicate} " + ", ".join(f'"{text} {lang}"@{lang}' for lang in langs)
+
+
+def _class(graph: int, i: int) -> str:
+    return f"ex:G{graph}C{i}"
+
+
+def write_model(
+    output_dir: str,
+    graphs: int = 2,
+    shapes: int = 100,
+    properties: int = 5,
+    depth: int = 4,
+    langs: int = 3,
+    seed: int = 1,
+) -> dict:
+    """
+    Write a synthetic model.
+
+    Args:
+        output_dir (str): Directory to write the files to.
+        graphs (int, optional): Number of SHACL files. Defaults to 2.
+        shapes (int, optional): Number of node shapes per SHACL file. Defaults to 100.
+        properties (int, optional): Number of property shapes per node shape. Defaults to 5.
+        depth (int, optional): Number of levels of the subclass hierarchies. Defaults to 4.
+        langs (int, optional): Number of languages of the labels. Defaults to 3.
+        seed (int, optional): Seed of the random choices. Defaults to 1.
+
+    Returns:
+        dict: The paths of the files: "ontology" and "shacls", the SHACL file per graph name.
+    """
+    rnd = random.Random(seed)
+    lang_codes = languages(langs)
+    os.makedirs(output_dir, exist_ok=True)
+
+    ontology = [PREFIXES]
+    for g in range(graphs):
+        for i in range(shapes):
+            parts = [
+                "a rdfs:Class",
+                _literals("rdfs:label", f"Class {g}.{i}", lang_codes),
+                _literals("rdfs:comment", f"Comment of class {g}.{i}", lang_codes),
+            ]
+            if i % depth:
+                parts.append(f"rdfs:subClassOf {_class(g, i - 1)}")
+            ontology.append(f"{_class(g, i)} " + " ;\n    ".join(parts) + " .")
+    for p in range(shapes * properties):
+        ontology.append(
+            f"ex:p{p} a rdf:Property ;\n    "
+            + _literals("rdfs:label", f"property {p}", lang_codes)
+            + " ;\n    "
+            + _literals("skos:definition", f"Definition of property {p}", lang_codes)
+            + " ."
+        )
+    for v in range(ENUMERATION_SIZE * 4):
+        ontology.append(f"ex:v{v} " + _literals("rdfs:label", f"value {v}", lang_codes) + " .")
+    ontology_path = os.path.join(output_dir, "ontology.ttl")
+    with open(ontology_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(ontology) + "\n")
+
+    shacls = {}
+    for g in range(graphs):
+        shacl = [
+            PREFIXES,
+            f"<http://example.org/graph{g}> a owl:Ontology ;\n    "
+            + _literals("dct:title", f"Graph {g}", lang_codes)
+            + " ;\n    "
+            + _literals("dct:description", f"Description of graph {g}", lang_codes)
+            + ' ;\n    pav:version "1.0" ;\n    dct:created "2024-01-01"^^xsd:date ;\n'
+            + f'    dct:author [ schema:name "Author {g}" ; schema:email "author{g}@example.org" ] .',
+        ]
+        for i in range(shapes):
+            property_shapes = []
+            for j in range(properties):
+                path = f"ex:p{rnd.randrange(shapes * properties)}"
+                kind = (i + j) % 5
+                if kind == 0:
+                    constraint = f"sh:datatype {rnd.choice(DATATYPES)}"
+                elif kind == 1:
+                    # a class of any graph, crosslinked when it is another graph
+                    constraint = f"sh:class {_class(rnd.randrange(graphs), rnd.randrange(shapes))}"
+                elif kind == 2:
+                    constraint = (
+                        f"sh:or ( [ sh:class {_class(g, rnd.randrange(shapes))} ] "
+                        f"[ sh:or ( [ sh:datatype {rnd.choice(DATATYPES)} ] "
+                        f"[ sh:class {_class(rnd.randrange(graphs), rnd.randrange(shapes))} ] ) ] )"
+                    )
+                elif kind == 3:
+                    first = rnd.randrange(ENUMERATION_SIZE * 3)
+                    values = " ".join(f"ex:v{v}" for v in range(first, first + ENUMERATION_SIZE))
+                    constraint = f"sh:nodeKind sh:IRI ; sh:in ( {values} )"
+                else:
+                    constraint = "sh:nodeKind sh:IRI"
+                cardinality = f"sh:minCount {j % 2} ; sh:maxCount {1 + j % 3}"
+                if kind == 0 and j % 4 == 0:
+                    cardinality += " ; sh:uniqueLang true"
+                property_shapes.append(f"sh:path {path} ; {constraint} ; {cardinality}")
+            if i % 10 == 9 and property_shapes:
+                # alternatives of property shapes
+                body = "sh:or ( " + " ".join(f"[ {p} ]" for p in property_shapes) + " )"
+            else:
+                body = " ;\n    ".join(f"sh:property [ {p} ]" for p in property_shapes)
+            shacl.append(
+                f"exs:G{g}S{i} a sh:NodeShape ;\n    sh:targetClass {_class(g, i)}"
+                + (f" ;\n    {body}" if body else "")
+                + " ."
+            )
+        shacls[f"graph{g}"] = os.path.join(output_dir, f"graph{g}.shacl.ttl")
+        with open(shacls[f"graph{g}"], "w", encoding="utf-8") as f:
+            f.write("\n".join(shacl) + "\n")
+
+    return {"ontology": ontology_path, "shacls": shacls}
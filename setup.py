@@ -24,8 +24,8 @@ setup(
     url="https://github.com/viaacode/shacl2md",
     long_description=readme,
     long_description_content_type="text/markdown",
-    packages=find_packages(exclude=("tests", "docs")),
-    python_requires=">=3.7",
+    packages=find_packages(exclude=("tests", "docs", "benchmarks", "benchmarks.*")),
+    python_requires=">=3.8",
     install_requires=install_requires,
     include_package_data=True,
     entry_points={
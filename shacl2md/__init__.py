@@ -1,13 +1,20 @@
+import importlib
 import os
 
-import requests
-from tqdm import tqdm
-
-from shacl2md.generator import ShaclMarkdownGenerator
-
 PLANTUML_JAR_URL="https://github.com/plantuml/plantuml/releases/download/v1.2023.11/plantuml-{}.jar"
 PLANTUML_VERSION="1.2023.11"
 
+# The generators pull in rdflib and jinja2, they are only imported when used.
+_LAZY_ATTRIBUTES = {
+    "ShaclMarkdownGenerator": "shacl2md.generator",
+    "ShaclSnippetGenerator": "shacl2md.generator",
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_path():
     """
     Function to return the path to the shacl2md installation folder.
@@ -16,24 +23,16 @@ def get_path():
     path = os.path.realpath(os.path.dirname(__file__))
     return path
 
-def has_jar():
-    """
-    Checks the jar has been succesfully downloaded in
-    the installation folder.
-    @return A diagnostic Boolean
-    """
-    files = os.listdir(get_path())
-    for file in files:
-        if '.jar' in file:
-            return True
-    return False
-
 def download_jar(version= PLANTUML_VERSION):
     """
     Downloads the PlantUML jar to the shacl2md
-    installation folder.
+    installation folder. Diagrams are not rendered
+    until it is downloaded.
     @raises ConnectionError and Timeout
     """
+    import requests
+    from tqdm import tqdm
+
     print('Downloading the PlantUML jar, please wait...')
     try:
         path2jar = os.path.join(get_path(), 'plantuml.jar')
@@ -56,18 +55,3 @@ def download_jar(version= PLANTUML_VERSION):
         print('WARNING!!! download_jar() caught '
               + f'a {type(exc)} exception and passed it on.')
         raise
-
-# Checks if PlantUML is not installed. Installs it if so.
-try:
-    if not has_jar():  # PlantUML not installed.
-        print('No PlantUML jar has been found'
-              + ' in the installation folder.')
-        download_jar()
-except requests.ConnectionError as err:
-    print(f' A {type(err)} exception has been raised. \n'
-          + 'Installation unsuccessful!!!')
-    raise
-except requests.Timeout as exc:
-    print(f' A {type(exc)} exception has been raised. \n'
-          + 'Installation unsuccessful!!!')
-    raise
\ No newline at end of file
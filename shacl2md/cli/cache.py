@@ -0,0 +1,90 @@
+from typing import List, Optional
+
+import typer
+from rich import print
+from typing_extensions import Annotated
+
+from shacl2md.utilities.config import DEFAULT_CACHE_DIR
+
+app = typer.Typer(
+    add_completion=False,
+    help="Manage the cache of parsed RDF files, rendered diagrams, compiled templates and validation reports",
+)
+
+CacheDir = Annotated[
+    Optional[str],
+    typer.Option(
+        "--cache_dir",
+        help="The directory of the cache of parsed files, rendered diagrams, compiled templates and validation reports",
+    ),
+]
+
+
+@app.command()
+def warm(
+    files: Annotated[
+        List[str],
+        typer.Argument(
+            help="The paths to the SHACL and ontology files to parse into the cache",
+        ),
+    ],
+    cache_dir: CacheDir = DEFAULT_CACHE_DIR,
+):
+    from shacl2md.utilities.cache import ParseCache
+
+    parse_cache = ParseCache(cache_dir)
+    parsed = parse_cache.warm(files)
+    print(
+        f"Parsed {len(parsed)} file(s), {len(files) - len(parsed)} already cached in {cache_dir}"
+    )
+
+
+@app.command()
+def clear(
+    cache_dir: CacheDir = DEFAULT_CACHE_DIR,
+):
+    from shacl2md.utilities.cache import (
+        DiagramCache,
+        ParseCache,
+        TemplateCache,
+        ValidationCache,
+    )
+    from shacl2md.utilities.plantuml import get_jar_path
+
+    removed = ParseCache(cache_dir).clear()
+    removed_diagrams = DiagramCache(cache_dir, get_jar_path()).clear()
+    removed_templates = TemplateCache(cache_dir).clear()
+    removed_reports = ValidationCache(cache_dir).clear()
+    print(
+        f"Removed {removed} cached file(s), {removed_diagrams} cached diagram file(s), {removed_templates} compiled template(s) and {removed_reports} validation report(s) from {cache_dir}"
+    )
+
+
+@app.command()
+def info(
+    cache_dir: CacheDir = DEFAULT_CACHE_DIR,
+):
+    from shacl2md.utilities.cache import (
+        DiagramCache,
+        ParseCache,
+        TemplateCache,
+        ValidationCache,
+    )
+    from shacl2md.utilities.plantuml import get_jar_path
+
+    parse_cache = ParseCache(cache_dir)
+    diagram_cache = DiagramCache(cache_dir, get_jar_path())
+    template_cache = TemplateCache(cache_dir)
+    validation_cache = ValidationCache(cache_dir)
+    print(f"Cache directory: {cache_dir}")
+    print(f"Cached files: {len(parse_cache.files())}")
+    print(f"Cached diagram files: {len(diagram_cache.files())}")
+    print(f"Compiled templates: {len(template_cache.files())}")
+    print(f"Cached validation reports: {len(validation_cache.files())}")
+    size = (
+        parse_cache.size()
+        + diagram_cache.size()
+        + template_cache.size()
+        + validation_cache.size()
+    )
+    print(f"Size: {size / 1024 / 1024:.1f} MiB")
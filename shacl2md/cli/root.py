@@ -4,9 +4,28 @@ import typer
 from rich import print
 from typing_extensions import Annotated
 
-from shacl2md import ShaclMarkdownGenerator, download_jar
+from shacl2md.cli import cache
+from shacl2md.utilities.config import DEFAULT_CACHE_DIR, DIAGRAM_TIMEOUT
 
 app = typer.Typer(add_completion=False)
+app.add_typer(cache.app, name="cache")
+
+
+def parse_shacl_files(shacl_files: List[str]) -> dict:
+    shacl_files_dict = {}
+    try:
+        for shacl_file in shacl_files:
+            graph_name, shacl_file_path = shacl_file.rsplit(":", 1)
+            shacl_files_dict[graph_name] = shacl_file_path.split(",")
+    except ValueError as e:
+        if str(e) == "not enough values to unpack (expected 2, got 1)":
+            print(
+                f"[bold red]Your shacl files must include the name of the graph of your file.[/bold red]\nTry <graph_name>:{shacl_file}"
+            )
+            raise typer.Exit(1)
+        else:
+            raise e
+    return shacl_files_dict
 
 
 @app.command(context_settings={"allow_extra_args": True})
@@ -47,6 +66,13 @@ def generate(
             help="Validate the SHACL files with SHACL",
         ),
     ] = False,
+    validation_report: Annotated[
+        Optional[str],
+        typer.Option(
+            "--validation_report",
+            help="Validate the SHACL files with SHACL and write the reports to this JSON file",
+        ),
+    ] = None,
     version_directory: Annotated[
         bool,
         typer.Option(
@@ -54,6 +80,27 @@ def generate(
             help="Create a version directory for the documentation",
         ),
     ] = False,
+    prune_ontology: Annotated[
+        bool,
+        typer.Option(
+            "--prune_ontology",
+            help="Only load the parts of the ontology files referenced by the SHACL files",
+        ),
+    ] = False,
+    parse_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache",
+            help="Reuse parsed SHACL and ontology files, rendered diagrams, compiled templates and validation reports from the cache directory",
+        ),
+    ] = False,
+    cache_dir: Annotated[
+        Optional[str],
+        typer.Option(
+            "--cache_dir",
+            help="The directory of the cache of parsed files, rendered diagrams, compiled templates and validation reports",
+        ),
+    ] = DEFAULT_CACHE_DIR,
     crosslink: Annotated[
         bool,
         typer.Option(
@@ -61,6 +108,77 @@ def generate(
             help="Crosslink between graphs",
         ),
     ] = False,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help="Only regenerate the pages whose input files, options or templates changed since the last incremental build",
+        ),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "-j",
+            "--jobs",
+            help="The number of processes that generate the documentation in parallel",
+        ),
+    ] = 1,
+    diagram_timeout: Annotated[
+        int,
+        typer.Option(
+            "--diagram_timeout",
+            help="The number of seconds PlantUML may spend on a single diagram",
+        ),
+    ] = DIAGRAM_TIMEOUT,
+    diagram_backend: Annotated[
+        str,
+        typer.Option(
+            "--diagram_backend",
+            help="How to render the class diagram: plantuml (needs Java), mermaid (rendered in the browser) or none",
+        ),
+    ] = "plantuml",
+    plantuml_jar: Annotated[
+        Optional[str],
+        typer.Option(
+            "--plantuml_jar",
+            help="The path to an existing PlantUML jar, instead of the jar in $SHACL2MD_PLANTUML_JAR or the downloaded jar",
+        ),
+    ] = None,
+    rdf_format: Annotated[
+        str,
+        typer.Option(
+            "--rdf_format",
+            help="The format of the RDF file next to the documentation: turtle, nt or json-ld",
+        ),
+    ] = "turtle",
+    rdf_shapes_only: Annotated[
+        bool,
+        typer.Option(
+            "--rdf_shapes_only",
+            help="Only write the SHACL shapes to the RDF file, without the ontology files",
+        ),
+    ] = False,
+    profile: Annotated[
+        Optional[str],
+        typer.Option(
+            "--profile",
+            help="Time the phases of the build per graph and language, write the timings to this JSON file and print a summary",
+        ),
+    ] = None,
+    profile_top: Annotated[
+        int,
+        typer.Option(
+            "--profile_top",
+            help="The number of phases in the summary of --profile, the ones that took longest",
+        ),
+    ] = 10,
+    query_stats: Annotated[
+        bool,
+        typer.Option(
+            "--query_stats",
+            help="Print the time and rows of the queries and lookups that extract the models, and the slowest shapes",
+        ),
+    ] = False,
     jekyll_parent_page: Annotated[
         Optional[str],
         typer.Option(
@@ -83,31 +201,176 @@ def generate(
         ),
     ] = 1,
 ):
-    shacl_files_dict = {}
-    try:
-        for shacl_file in shacl_files:
-            graph_name, shacl_file_path = shacl_file.rsplit(":", 1)
-            shacl_files_dict[graph_name] = shacl_file_path.split(",")
-    except ValueError as e:
-        if str(e) == "not enough values to unpack (expected 2, got 1)":
-            print(
-                f"[bold red]Your shacl files must include the name of the graph of your file.[/bold red]\nTry <graph_name>:{shacl_file}"
-            )
-            raise typer.Exit(1)
-        else:
-            raise e
+    from shacl2md import ShaclMarkdownGenerator
+
+    shacl_files_dict = parse_shacl_files(shacl_files)
     shacl2md_generator = ShaclMarkdownGenerator(
         languages=languages,
         output_dir=output_dir,
-        shacl_shacl_validation=shacl_shacl_validation,
+        shacl_shacl_validation=shacl_shacl_validation or validation_report is not None,
         version_directory=version_directory,
         crosslink_between_graphs=crosslink,
         jekyll_parent_page=jekyll_parent_page,
         jekyll_layout=jekyll_layout,
         jekyll_nav_order=jekyll_nav_order,
         ontology_graphs=ontology_files,
+        prune_ontology=prune_ontology,
+        cache_dir=cache_dir if parse_cache else None,
+        diagram_timeout=diagram_timeout,
+        plantuml_jar=plantuml_jar,
+        diagram_backend=diagram_backend,
+        rdf_format=rdf_format,
+        rdf_shapes_only=rdf_shapes_only,
+        profile=profile is not None,
+        query_stats=query_stats,
     )
-    shacl2md_generator.generate(**shacl_files_dict)
+    shacl2md_generator.generate(
+        jobs=jobs, incremental=incremental, **shacl_files_dict
+    )
+    if validation_report is not None:
+        shacl2md_generator.write_validation_report(validation_report)
+    if profile is not None:
+        shacl2md_generator.profiler.write(profile)
+        typer.echo(shacl2md_generator.profiler.format_summary(profile_top))
+    if query_stats:
+        typer.echo(shacl2md_generator.query_stats.format_summary())
+
+
+@app.command(context_settings={"allow_extra_args": True})
+def watch(
+    shacl_files: Annotated[
+        List[str],
+        typer.Argument(
+            help="The path to SHACL files, with graph name to be processed, in the form of `model_name:./path/to/shacl_file/ttl`",
+        ),
+    ],
+    languages: Annotated[
+        List[str],
+        typer.Option(
+            "-l",
+            "--languages",
+            help="The languages to generate the documentation for",
+        ),
+    ],
+    output_dir: Annotated[
+        Optional[str],
+        typer.Option(
+            "-o",
+            "--output_dir",
+            help="The directory to output the documentation to",
+        ),
+    ] = "./docs",
+    ontology_files: Annotated[
+        List[str],
+        typer.Option(
+            "--ontology_file",
+            help="The path to the ontology files",
+        ),
+    ] = [],
+    version_directory: Annotated[
+        bool,
+        typer.Option(
+            "--version_directory",
+            help="Create a version directory for the documentation",
+        ),
+    ] = False,
+    parse_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache",
+            help="Reuse parsed SHACL and ontology files, rendered diagrams, compiled templates and validation reports from the cache directory",
+        ),
+    ] = False,
+    cache_dir: Annotated[
+        Optional[str],
+        typer.Option(
+            "--cache_dir",
+            help="The directory of the cache of parsed files, rendered diagrams, compiled templates and validation reports",
+        ),
+    ] = DEFAULT_CACHE_DIR,
+    crosslink: Annotated[
+        bool,
+        typer.Option(
+            "--crosslink",
+            help="Crosslink between graphs",
+        ),
+    ] = False,
+    interval: Annotated[
+        float,
+        typer.Option(
+            "--interval",
+            help="The number of seconds between two checks for changed files",
+        ),
+    ] = 1.0,
+    diagram_backend: Annotated[
+        str,
+        typer.Option(
+            "--diagram_backend",
+            help="How to render the class diagram: plantuml (needs Java), mermaid (rendered in the browser) or none",
+        ),
+    ] = "plantuml",
+    plantuml_jar: Annotated[
+        Optional[str],
+        typer.Option(
+            "--plantuml_jar",
+            help="The path to an existing PlantUML jar, instead of the jar in $SHACL2MD_PLANTUML_JAR or the downloaded jar",
+        ),
+    ] = None,
+    rdf_format: Annotated[
+        str,
+        typer.Option(
+            "--rdf_format",
+            help="The format of the RDF file next to the documentation: turtle, nt or json-ld",
+        ),
+    ] = "turtle",
+    rdf_shapes_only: Annotated[
+        bool,
+        typer.Option(
+            "--rdf_shapes_only",
+            help="Only write the SHACL shapes to the RDF file, without the ontology files",
+        ),
+    ] = False,
+    jekyll_parent_page: Annotated[
+        Optional[str],
+        typer.Option(
+            "--jekyll_parent_page",
+            help="The parent page for the Jekyll documentation",
+        ),
+    ] = "index",
+    jekyll_layout: Annotated[
+        Optional[str],
+        typer.Option(
+            "--jekyll_layout",
+            help="The layout for the Jekyll documentation",
+        ),
+    ] = "default",
+    jekyll_nav_order: Annotated[
+        Optional[int],
+        typer.Option(
+            "--jekyll_nav_order",
+            help="The navigation order for the Jekyll documentation",
+        ),
+    ] = 1,
+):
+    from shacl2md import ShaclMarkdownGenerator
+
+    shacl_files_dict = parse_shacl_files(shacl_files)
+    shacl2md_generator = ShaclMarkdownGenerator(
+        languages=languages,
+        output_dir=output_dir,
+        version_directory=version_directory,
+        crosslink_between_graphs=crosslink,
+        jekyll_parent_page=jekyll_parent_page,
+        jekyll_layout=jekyll_layout,
+        jekyll_nav_order=jekyll_nav_order,
+        ontology_graphs=ontology_files,
+        cache_dir=cache_dir if parse_cache else None,
+        plantuml_jar=plantuml_jar,
+        diagram_backend=diagram_backend,
+        rdf_format=rdf_format,
+        rdf_shapes_only=rdf_shapes_only,
+    )
+    shacl2md_generator.watch(interval=interval, **shacl_files_dict)
 
 
 @app.command(context_settings={"allow_extra_args": True})
@@ -119,6 +382,8 @@ def download_plantuml_jar(
         ),
     ] = "1.2023.11",
 ):
+    from shacl2md import download_jar
+
     download_jar(version)
 
 
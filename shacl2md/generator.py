@@ -1,24 +1,135 @@
-import subprocess
+import asyncio
+import functools
+import hashlib
 import json
+import multiprocessing
 import os
-from os.path import abspath
-from logging import Logger, getLogger, StreamHandler, INFO
-from typing import List, Union
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from logging import Handler, Logger, getLogger, StreamHandler, INFO
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 import sys
+import time
 
 from jinja2 import Environment, PackageLoader, select_autoescape
-from lxml import etree
-from pyshacl import validate
 from rdflib.graph import Graph
 from rdflib.namespace import Namespace
-from rdflib.term import Literal
 
-from shacl2md.utilities.lang_labels import get_lang_labels
-from shacl2md.utilities.queries import GET_AUTHORS, GET_CLASSES, GET_DOC_MD
-from shacl2md.utilities.rdf import RDFClass, to_shortname
+from shacl2md.utilities.cache import (
+    DiagramCache,
+    ParseCache,
+    TemplateCache,
+    ValidationCache,
+    file_hash,
+    write_atomic,
+)
+from shacl2md.utilities.lang_labels import LANG_LABELS, get_lang_labels
+from shacl2md.utilities.manifest import BuildManifest, fingerprint
+from shacl2md.utilities.ontology import PrunedGraph, referenced_iris
+from shacl2md.utilities.plantuml import (
+    DIAGRAM_TIMEOUT,
+    arender_svgs,
+    get_jar_path,
+    inline_svg,
+    render_svgs,
+    svg_path,
+)
+from shacl2md.utilities.profile import Profiler
+from shacl2md.utilities.query_stats import QueryStats
+from shacl2md.utilities.rdf import (
+    ClassIndex,
+    ClassRegistry,
+    RDFClass,
+    ShaclModel,
+    order_by_label,
+    to_shortname,
+)
+from shacl2md.utilities.validation import ValidationReport, validate_shapes
 
 SHACL = Namespace("http://www.w3.org/ns/shacl#")
 
+# Stands in for the diagram in pages rendered before the diagrams are
+DIAGRAM_PLACEHOLDER = "<!-- shacl2md:diagram -->"
+
+DIAGRAM_BACKENDS = ("plantuml", "mermaid", "none")
+
+# The rdflib formats the SHACL graphs can be written in, with their file extension
+RDF_FORMATS = {"turtle": "ttl", "nt": "nt", "json-ld": "jsonld"}
+
+# The generator shared with forked worker processes, see ShaclMarkdownGenerator.generate
+_worker_generator = None
+
+
+class _RecordHandler(Handler):
+    def __init__(self, records: list):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@functools.lru_cache(maxsize=None)
+def _template_environment(cache_dir: Optional[str]) -> Environment:
+    # one environment per cache directory, its templates are compiled once
+    # per process, or loaded from the cache directory
+    return Environment(
+        loader=PackageLoader("shacl2md"),
+        autoescape=select_autoescape(),
+        trim_blocks=True,
+        bytecode_cache=None if cache_dir is None else TemplateCache(cache_dir),
+    )
+
+
+def _init_worker(generator):
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _worker_records() -> list:
+    # buffer the log records of a task in a worker process
+    generator = _worker_generator
+    records = []
+    logger = Logger(generator.logger.name, generator.logger.getEffectiveLevel())
+    logger.addHandler(_RecordHandler(records))
+    generator.logger = logger
+    return records
+
+
+def _worker_profiler() -> Profiler:
+    # record the spans of a task in a worker process, see Profiler.fork
+    generator = _worker_generator
+    generator.profiler = generator.profiler.fork()
+    return generator.profiler
+
+
+def _generate_unit(name: str, lang: str):
+    """
+    Generate the documentation of one graph in one language in a worker process.
+
+    The page is written with a placeholder for its diagram, the diagrams of
+    all pages are rendered afterwards by the parent process. The log records
+    are buffered and returned, so the parent process can emit them in a
+    deterministic order, and so are the timing spans.
+    """
+    records = _worker_records()
+    profiler = _worker_profiler()
+    with profiler.span("page", graph=name, lang=lang):
+        page = ShaclGraph(name, lang, _worker_generator).draft_page()
+    return page, records, [span.to_dict() for span in profiler.spans]
+
+
+def _validate_graph(name: str):
+    """
+    Validate one graph in a worker process, see Generator.validate_graph.
+    The report is returned as a dict, with the buffered log records and the timing spans.
+    """
+    records = _worker_records()
+    profiler = _worker_profiler()
+    report = _worker_generator.validate_graph(name)
+    return report.to_dict(), records, [span.to_dict() for span in profiler.spans]
+
 
 class Generator:
     def __init__(
@@ -28,10 +139,30 @@ class Generator:
         shacl_shacl_validation: bool = False,
         ontology_graphs: List[Union[str, Graph]] = None,
         logger: Logger = None,
+        prune_ontology: bool = False,
+        cache_dir: str = None,
+        profile: bool = False,
+        query_stats: bool = False,
     ):
         self.output_dir: str = output_dir
         self.shacl_shacl_validation: bool = shacl_shacl_validation
+        self.prune_ontology: bool = prune_ontology
+        self.parse_cache: ParseCache = ParseCache(cache_dir)
         self.graphs: dict = {}
+        self.models: dict = {}
+        self.class_index: ClassIndex = None
+        self.class_registry: ClassRegistry = ClassRegistry()
+        # the file each graph was serialized to in this run, see write_rdf
+        self.serialized_graphs: Dict[str, str] = {}
+        # the files or Graphs each SHACL graph was loaded from
+        self.shacl_sources: Dict[str, list] = {}
+        self.validation_cache: ValidationCache = ValidationCache(cache_dir)
+        self.validation_reports: Dict[str, ValidationReport] = {}
+        self.profiler: Profiler = Profiler(record=profile)
+        self.query_stats: Optional[QueryStats] = QueryStats() if query_stats else None
+        self.ontology_sources: List[Union[str, Graph]] = []
+        # (graph name, language) units that are not built, see ShaclMarkdownGenerator.generate
+        self.skipped_units: set = set()
         self.ontology_graph: Graph = Graph(
             identifier="ontology_graph", bind_namespaces="none"
         )
@@ -56,12 +187,42 @@ class Generator:
         Args:
             ontology_graph (str | Graph): Ontology graph to add.
         """
-        if isinstance(ontology_graph, str):
-            self.ontology_graph.parse(ontology_graph)
-        elif isinstance(ontology_graph, Graph):
-            self.ontology_graph += ontology_graph
-            for name, uri in ontology_graph.namespaces():
-                self.ontology_graph.bind(name, uri)
+        if not self.prune_ontology:
+            # a pruned ontology is loaded once the SHACL graphs are known, see load_pruned_ontology
+            self._load_ontology_source(ontology_graph, self.ontology_graph)
+        self.ontology_sources.append(ontology_graph)
+
+    def _load_ontology_source(self, ontology_source: Union[str, Graph], g: Graph):
+        if isinstance(ontology_source, str):
+            with self.profiler.span("parse", file=ontology_source):
+                self.parse_cache.load(ontology_source, g)
+        elif isinstance(ontology_source, Graph):
+            with self.profiler.span("merge", graph="ontology_graph"):
+                g += ontology_source
+                for name, uri in ontology_source.namespaces():
+                    g.bind(name, uri)
+
+    def load_pruned_ontology(self):
+        """
+        Load the ontology graphs, keeping only the labels, descriptions, types
+        and superclasses of the IRIs referenced by the SHACL graphs and of
+        their superclasses.
+        """
+        ontology_graph = PrunedGraph(
+            identifier="ontology_graph", bind_namespaces="none"
+        )
+        for ontology_source in self.ontology_sources:
+            with self.profiler.span(
+                "parse",
+                file=ontology_source if isinstance(ontology_source, str) else None,
+            ):
+                ontology_graph.load(ontology_source, self.parse_cache)
+        with self.profiler.span("prune"):
+            kept, dropped = ontology_graph.prune(referenced_iris(self.graphs.values()))
+        self.ontology_graph = ontology_graph
+        self.logger.info(
+            f"* Ontology pruned: {kept} triples kept, {dropped} triples dropped"
+        )
 
     def get_graph(self, graph_name: str):
         """
@@ -72,14 +233,42 @@ class Generator:
         """
         return self.graphs[graph_name]
 
-    def add_shacl_graphs(self, **shacls):
+    def get_model(self, graph_name: str):
         """
-        Add SHACL graphs.
+        Get the language-neutral model of a graph by name.
+
+        Args:
+            graph_name (str): Name of the graph to get the model of.
+        """
+        return self.models[graph_name]
+
+    def reload_ontology_graphs(self):
+        """
+        Load the ontology graphs again, e.g., after their files changed.
+
+        The ontology graph is only replaced once every file is loaded. When a
+        file cannot be parsed, e.g., while it is being edited, the previous
+        ontology graph is kept.
+        """
+        if self.prune_ontology:
+            # loaded again with the SHACL graphs, see load_pruned_ontology
+            return
+        ontology_graph = Graph(identifier="ontology_graph", bind_namespaces="none")
+        for ontology_source in self.ontology_sources:
+            self._load_ontology_source(ontology_source, ontology_graph)
+        self.ontology_graph = ontology_graph
+
+    def load_shacl_graphs(self, **shacls):
+        """
+        Parse SHACL graphs and extract their language-neutral models.
 
         Args:
             **shacls: Dictionary of SHACL files or Graphs to generate documentation for. The key is the name of the SHACL graph, the value is the filename of the SHACL file.
         """
-        shacl_graphs: List[ShaclGraph] = []
+        with self.profiler.span("load"):
+            self._load_shacl_graphs(**shacls)
+
+    def _load_shacl_graphs(self, **shacls):
         # parse shacl files to graphs
         for shacl, shacl_filename_or_graphs in shacls.items():
             g = Graph(identifier=shacl, bind_namespaces="none")
@@ -89,22 +278,148 @@ class Generator:
 
             for shacl_filename_or_graph in shacl_filename_or_graphs:
                 if isinstance(shacl_filename_or_graph, str):
-                    g.parse(shacl_filename_or_graph)
+                    with self.profiler.span("parse", graph=shacl, file=shacl_filename_or_graph):
+                        self.parse_cache.load(shacl_filename_or_graph, g)
                 elif isinstance(shacl_filename_or_graph, Graph):
-                    g += shacl_filename_or_graph
-                    for name, uri in shacl_filename_or_graph.namespaces():
-                        g.bind(name, uri)
+                    with self.profiler.span("merge", graph=shacl):
+                        g += shacl_filename_or_graph
+                        for name, uri in shacl_filename_or_graph.namespaces():
+                            g.bind(name, uri)
             self.graphs[shacl] = g
+            self.shacl_sources[shacl] = shacl_filename_or_graphs
+
+        if self.prune_ontology:
+            self.load_pruned_ontology()
+
+        # extract every graph once, all languages are built from that model;
+        # a pruned ontology changes with the graphs, so all models are rebuilt
+        for shacl in self.graphs.keys() if self.prune_ontology else shacls.keys():
+            with self.profiler.span("extract", graph=shacl):
+                self.models[shacl] = ShaclModel(
+                    shacl, self.graphs[shacl], self.ontology_graph, self.query_stats
+                )
+            self.class_registry.forget(shacl)
+            self.serialized_graphs.pop(shacl, None)
+        with self.profiler.span("crosslink"):
+            self.class_index = ClassIndex(self.models.values(), self.languages)
+
+    def add_shacl_graphs(self, **shacls):
+        """
+        Add SHACL graphs.
+
+        Args:
+            **shacls: Dictionary of SHACL files or Graphs to generate documentation for. The key is the name of the SHACL graph, the value is the filename of the SHACL file.
+        """
+        self.load_shacl_graphs(**shacls)
+        return self.build_shacl_graphs()
 
+    def build_shacl_graphs(self):
+        """
+        Build the graph and language units of the loaded SHACL graphs, except the skipped units.
+        """
+        shacl_graphs: List[ShaclGraph] = []
         for shacl in self.graphs.keys():
             for lang in self.languages:
+                if (shacl, lang) in self.skipped_units:
+                    continue
                 shacl_graph = ShaclGraph(shacl, lang, self)
                 shacl_graphs.append(shacl_graph)
-            if self.shacl_shacl_validation:
-                shacl_graph.validate()
+        if self.shacl_shacl_validation:
+            self.validate_shacl_graphs(self.graphs_to_validate())
 
         return shacl_graphs
 
+    def graphs_to_validate(self) -> List[str]:
+        """
+        Get the loaded SHACL graphs that have a unit to build, except the skipped units.
+        """
+        return [
+            shacl
+            for shacl in self.graphs.keys()
+            if any((shacl, lang) not in self.skipped_units for lang in self.languages)
+        ]
+
+    def validate_graph(self, graph_name: str) -> ValidationReport:
+        """
+        Validate the shapes of a SHACL graph against the SHACL specification,
+        without the ontology graphs. With a cache directory, the report of
+        unchanged files is reused.
+
+        Args:
+            graph_name (str): Name of the graph.
+        """
+        with self.profiler.span("validate", graph=graph_name):
+            key = self.validation_cache.key(self.shacl_sources.get(graph_name, []))
+            cached = self.validation_cache.get(key)
+            if cached is not None:
+                report = ValidationReport.from_dict(cached)
+            else:
+                report = validate_shapes(graph_name, self.graphs[graph_name])
+                if key is not None:
+                    self.validation_cache.put(key, report.to_dict())
+        self.logger.info(f"* {report.results_text}")
+        self.validation_reports[graph_name] = report
+        return report
+
+    def validate_shacl_graphs(
+        self, graph_names: List[str], jobs: int = 1
+    ) -> Dict[str, ValidationReport]:
+        """
+        Validate SHACL graphs, see validate_graph, in up to jobs processes.
+
+        Args:
+            graph_names (List[str]): Names of the graphs.
+            jobs (int, optional): Number of processes that validate the graphs in parallel. Defaults to 1.
+
+        Returns:
+            Dict[str, ValidationReport]: The report per graph.
+        """
+        if (
+            jobs > 1
+            and len(graph_names) > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+        ):
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(graph_names)),
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+                initargs=(self,),
+            ) as executor:
+                for name, (report, records, spans) in zip(
+                    graph_names, executor.map(_validate_graph, graph_names)
+                ):
+                    for record in records:
+                        self.logger.handle(record)
+                    self.profiler.merge(spans)
+                    self.validation_reports[name] = ValidationReport.from_dict(report)
+        else:
+            for name in graph_names:
+                self.validate_graph(name)
+        return {name: self.validation_reports[name] for name in graph_names}
+
+    def write_validation_report(self, path: str):
+        """
+        Write the validation reports of the graphs as JSON: whether all graphs
+        conform and, per graph, whether it conforms and its SHACL results graph
+        in Turtle.
+
+        Args:
+            path (str): Path of the JSON file.
+        """
+        write_atomic(
+            path,
+            json.dumps(
+                {
+                    "conforms": all(r.conforms for r in self.validation_reports.values()),
+                    "graphs": {
+                        name: report.to_dict()
+                        for name, report in self.validation_reports.items()
+                    },
+                },
+                indent=2,
+            ).encode("utf-8"),
+        )
+
 
 class ShaclMarkdownGenerator(Generator):
     def __init__(
@@ -119,6 +434,15 @@ class ShaclMarkdownGenerator(Generator):
         jekyll_nav_order: int = 1,
         ontology_graphs: List[Union[str, Graph]] = None,
         logger: Logger = None,
+        prune_ontology: bool = False,
+        cache_dir: str = None,
+        diagram_timeout: int = DIAGRAM_TIMEOUT,
+        plantuml_jar: str = None,
+        diagram_backend: str = "plantuml",
+        rdf_format: str = "turtle",
+        rdf_shapes_only: bool = False,
+        profile: bool = False,
+        query_stats: bool = False,
     ):
         """
         A shacl markdown generator object.
@@ -134,9 +458,45 @@ class ShaclMarkdownGenerator(Generator):
             jekyll_nav_order (int, optional): Jekyll nav order. Defaults to 1.
             ontology_graphs (List[str | Graph], optional): List of ontology files or Graphs, to include with the SHACL shapes, e.g., class definitions or reasoning. Defaults to [].
             logger (Logger, optional): logging.Logger. Defaults to None.
+            prune_ontology (bool, optional): Only keep the labels, descriptions, types and superclasses of the IRIs referenced by the SHACL graphs, and of their superclasses, from the ontology graphs. Defaults to False.
+            cache_dir (str, optional): Directory of the persistent cache of parsed files, rendered diagrams and compiled templates. Defaults to None, files are then only parsed once per run, diagrams are always rendered and templates are compiled once per process.
+            diagram_timeout (int, optional): Seconds PlantUML may spend on a single diagram. Defaults to 60.
+            plantuml_jar (str, optional): Path of an existing PlantUML jar. Defaults to None, the jar in $SHACL2MD_PLANTUML_JAR or in the shacl2md installation folder is then used, see `shacl2md download-plantuml-jar`.
+            diagram_backend (str, optional): How the class diagram is rendered: "plantuml" renders an SVG with PlantUML and Java, "mermaid" adds a Mermaid diagram that is rendered in the browser, "none" leaves the diagram out. Defaults to "plantuml".
+            rdf_format (str, optional): The format of the RDF file next to the documentation: "turtle", "nt" or "json-ld". Defaults to "turtle".
+            rdf_shapes_only (bool, optional): Only write the SHACL shapes to the RDF file, without the ontology graphs. Defaults to False.
+            profile (bool, optional): Record how long the phases of the build take, per graph and language, see Profiler. Defaults to False.
+            query_stats (bool, optional): Collect statistics of the queries and lookups that extract the models, see QueryStats. Defaults to False.
+
+        Raises:
+            ValueError: Raised when the diagram backend or the RDF format is unknown.
         """
         super().__init__(
-            languages, output_dir, shacl_shacl_validation, ontology_graphs, logger
+            languages,
+            output_dir,
+            shacl_shacl_validation,
+            ontology_graphs,
+            logger,
+            prune_ontology,
+            cache_dir,
+            profile,
+            query_stats,
+        )
+        self.diagram_timeout: int = diagram_timeout
+        self.plantuml_jar: str = plantuml_jar
+        if diagram_backend not in DIAGRAM_BACKENDS:
+            raise ValueError(
+                f"Unknown diagram backend '{diagram_backend}', use one of {', '.join(DIAGRAM_BACKENDS)}"
+            )
+        self.diagram_backend: str = diagram_backend
+        if rdf_format not in RDF_FORMATS:
+            raise ValueError(
+                f"Unknown RDF format '{rdf_format}', use one of {', '.join(RDF_FORMATS)}"
+            )
+        self.rdf_format: str = rdf_format
+        self.rdf_shapes_only: bool = rdf_shapes_only
+        self.diagram_cache: DiagramCache = DiagramCache(
+            cache_dir, get_jar_path(plantuml_jar)
         )
         self.version_directory: bool = version_directory
         self.crosslink_between_graphs: bool = crosslink_between_graphs
@@ -144,13 +504,10 @@ class ShaclMarkdownGenerator(Generator):
         self.jekyll_layout: str = jekyll_layout
         self.jekyll_nav_order: int = jekyll_nav_order
 
-        self.env = Environment(
-            loader=PackageLoader("shacl2md"),
-            autoescape=select_autoescape(),
-            trim_blocks=True,
-        )
+        self.env = _template_environment(cache_dir)
         self.template = self.env.get_template("template.md.jinja")
         self.puml_template = self.env.get_template("diagram.puml.jinja")
+        self.mermaid_template = self.env.get_template("mermaid.jinja")
 
     def filter_language(self, lang: str):
         """
@@ -170,12 +527,16 @@ class ShaclMarkdownGenerator(Generator):
         """
         return [g for n, g in self.graphs.items() if n != graph_name]
 
-    def generate(self, exclude: list = None, **shacls) -> None:
+    def generate(
+        self, exclude: list = None, jobs: int = 1, incremental: bool = False, **shacls
+    ) -> None:
         """
         Generate markdown documentation from SHACL files.
 
         Args:
             exclude: list of graph names for which docs should not be generated
+            jobs: number of processes that generate the graph and language pages in parallel. Defaults to 1.
+            incremental: only build the graph and language pages whose input files, options or templates changed since the last incremental build in the output directory. Defaults to False.
             **shacls: Dictionary of SHACL files or Graphs to generate documentation for. The key is the name of the SHACL graph, the value is the filename of the SHACL file.
 
         Raises:
@@ -200,12 +561,581 @@ class ShaclMarkdownGenerator(Generator):
         """
         if not exclude:
             exclude = []
-        shacl_graphs: List[ShaclGraph] = self.add_shacl_graphs(**shacls)
+        if jobs > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            self.logger.warning(
+                "* Parallel generation needs the fork start method; generating sequentially."
+            )
+            jobs = 1
+        self.skipped_units = set()
+        if incremental:
+            manifest = BuildManifest(self.output_dir)
+            fingerprints = self.unit_fingerprints(exclude, **shacls)
+            shacls = self._plan_incremental(manifest, fingerprints, exclude, **shacls)
+            if not shacls:
+                return
 
-        for shacl_graph in shacl_graphs:
-            if shacl_graph.name in exclude or shacl_graph.name == "exclude":
+        with self.profiler.span("generate"):
+            if jobs > 1:
+                built = self._generate_parallel(exclude, jobs, **shacls)
+            else:
+                built = self._write_pages(self.add_shacl_graphs(**shacls), exclude)
+
+        if incremental:
+            for shacl, lang, output_dir, complete in built:
+                # a page without its diagram is rebuilt next time
+                manifest.record(
+                    shacl,
+                    lang,
+                    fingerprints[(shacl, lang)] if complete else None,
+                    output_dir,
+                )
+            manifest.save()
+
+    def _write_pages(
+        self, shacl_graphs: List["ShaclGraph"], exclude: list
+    ) -> List[tuple]:
+        shacl_graphs = [
+            shacl_graph
+            for shacl_graph in shacl_graphs
+            if shacl_graph.name not in exclude and shacl_graph.name != "exclude"
+        ]
+
+        if self.diagram_backend == "plantuml":
+            # all diagrams are rendered at once, starting a single JVM; until
+            # then the pages are written with a placeholder for their diagram
+            pages = []
+            for shacl_graph in shacl_graphs:
+                with self.profiler.span(
+                    "page", graph=shacl_graph.name, lang=shacl_graph.lang
+                ):
+                    pages.append(shacl_graph.draft_page())
+                shacl_graph.release_classes()
+            diagrams = self.render_diagrams([puml_path for _, puml_path in pages])
+            self.write_drafts(pages, diagrams)
+            complete = [diagrams[puml_path] is not None for _, puml_path in pages]
+        else:
+            complete = []
+            for shacl_graph in shacl_graphs:
+                with self.profiler.span(
+                    "page", graph=shacl_graph.name, lang=shacl_graph.lang
+                ):
+                    diagram_text = shacl_graph.render_diagram()
+                    shacl_graph.write_md(diagram_text)
+                shacl_graph.release_classes()
+                complete.append(
+                    diagram_text is not None or self.diagram_backend == "none"
+                )
+        self.logger.debug(
+            f"* Class registry: {self.class_registry.misses} superclasses extracted, {self.class_registry.hits} reused"
+        )
+        return [
+            (g.name, g.lang, g.output_dir, page_complete)
+            for g, page_complete in zip(shacl_graphs, complete)
+        ]
+
+    @property
+    def template_version(self) -> str:
+        """
+        The hash of the templates and the labels the pages are rendered with.
+        """
+        sha = hashlib.sha256()
+        for template in (self.template, self.puml_template, self.mermaid_template):
+            sha.update(
+                self.env.loader.get_source(self.env, template.name)[0].encode()
+            )
+        sha.update(json.dumps(LANG_LABELS, sort_keys=True).encode())
+        return sha.hexdigest()
+
+    def unit_fingerprints(self, exclude: list = None, **shacls) -> dict:
+        """
+        Fingerprint the inputs of every graph and language unit.
+
+        A unit depends on the files of its graph, the ontology files, the
+        generator options, the PlantUML jar that renders its diagram and the
+        templates. With crosslinks, it also depends
+        on the files of the other graphs. Graphs given as rdflib Graphs, or
+        sources that are not local files, e.g., URLs, cannot be fingerprinted,
+        units depending on them get None.
+
+        Args:
+            exclude: list of graph names for which docs should not be generated
+            **shacls: Dictionary of SHACL files or Graphs to generate documentation for.
+
+        Returns:
+            dict: The fingerprint per (graph name, language).
+        """
+        if not exclude:
+            exclude = []
+
+        def input_hashes(sources) -> list:
+            if not isinstance(sources, list):
+                sources = [sources]
+            return [
+                file_hash(source)
+                if isinstance(source, str) and os.path.isfile(source)
+                else None
+                for source in sources
+            ]
+
+        graph_inputs = {shacl: input_hashes(s) for shacl, s in shacls.items()}
+        shared_inputs = {
+            "ontology": input_hashes(self.ontology_sources),
+            "options": {
+                "output_dir": self.output_dir,
+                "languages": self.languages,
+                "version_directory": self.version_directory,
+                "crosslink_between_graphs": self.crosslink_between_graphs,
+                "jekyll_parent_page": self.jekyll_parent_page,
+                "jekyll_layout": self.jekyll_layout,
+                "jekyll_nav_order": self.jekyll_nav_order,
+                "prune_ontology": self.prune_ontology,
+                "diagram_backend": self.diagram_backend,
+                "rdf_format": self.rdf_format,
+                "rdf_shapes_only": self.rdf_shapes_only,
+            },
+            "templates": self.template_version,
+        }
+        if self.diagram_backend == "plantuml":
+            # another release of the jar renders other diagrams
+            shared_inputs["plantuml_jar"] = self.diagram_cache.jar_version
+        fingerprints = {}
+        for shacl in shacls.keys():
+            if shacl in exclude or shacl == "exclude":
                 continue
-            shacl_graph.generate_md()
+            inputs = dict(shared_inputs, graph=shacl, shacl=graph_inputs[shacl])
+            if self.crosslink_between_graphs:
+                inputs["crosslinks"] = {
+                    n: h for n, h in graph_inputs.items() if n != shacl
+                }
+            hashes = inputs["ontology"] + [
+                h for hs in graph_inputs.values() for h in hs
+            ]
+            for lang in self.languages:
+                fingerprints[(shacl, lang)] = (
+                    None if None in hashes else fingerprint(dict(inputs, lang=lang))
+                )
+        return fingerprints
+
+    def _plan_incremental(
+        self, manifest: BuildManifest, fingerprints: dict, exclude: list, **shacls
+    ) -> dict:
+        # Skips the fresh units and returns the graphs that have to be loaded.
+        self.skipped_units = {
+            (shacl, lang)
+            for shacl in shacls.keys()
+            for lang in self.languages
+            if (shacl, lang) not in fingerprints
+            or manifest.is_fresh(shacl, lang, fingerprints[(shacl, lang)])
+        }
+        fresh = sum(unit in self.skipped_units for unit in fingerprints)
+        self.logger.info(
+            f"* Incremental build: {fresh} of {len(fingerprints)} pages unchanged"
+        )
+        if len(fingerprints) == fresh:
+            return {}
+        if self.crosslink_between_graphs:
+            # all graphs are needed to crosslink
+            return shacls
+        return {
+            shacl: s
+            for shacl, s in shacls.items()
+            if any((shacl, lang) not in self.skipped_units for lang in self.languages)
+        }
+
+    def render_diagrams(self, puml_paths: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Render PlantUML diagrams to SVG, with a single PlantUML process.
+
+        Diagrams found in the diagram cache are copied instead of rendered.
+
+        Args:
+            puml_paths (List[str]): The PlantUML files to render.
+
+        Returns:
+            Dict[str, Optional[str]]: The SVG to inline per PlantUML file, None if it could not be rendered.
+        """
+        if not puml_paths:
+            return {}
+        diagrams, puml_paths = self._cached_diagrams(puml_paths)
+        with self.profiler.span("plantuml", diagrams=len(puml_paths)):
+            errors = render_svgs(
+                puml_paths, self.logger, self.diagram_timeout, self.plantuml_jar
+            )
+        rendered = self._inline_diagrams(errors)
+        return self._cache_diagrams(diagrams, rendered)
+
+    async def arender_diagrams(
+        self, puml_paths: List[str]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Render PlantUML diagrams to SVG, with a single PlantUML process, without
+        blocking the event loop. See render_diagrams.
+        """
+        if not puml_paths:
+            return {}
+        diagrams, puml_paths = self._cached_diagrams(puml_paths)
+        with self.profiler.span("plantuml", diagrams=len(puml_paths)):
+            errors = await arender_svgs(
+                puml_paths, self.logger, self.diagram_timeout, self.plantuml_jar
+            )
+        rendered = self._inline_diagrams(errors)
+        return self._cache_diagrams(diagrams, rendered)
+
+    def _cached_diagrams(self, puml_paths: List[str]):
+        diagrams = {}
+        for puml_path in puml_paths:
+            svg_text = self.diagram_cache.get(puml_path, svg_path(puml_path))
+            if svg_text is not None:
+                diagrams[puml_path] = svg_text
+        return diagrams, [p for p in puml_paths if p not in diagrams]
+
+    def _cache_diagrams(self, diagrams: dict, rendered: dict):
+        if not self.diagram_cache.enabled:
+            return rendered
+        for puml_path, svg_text in rendered.items():
+            if svg_text is not None:
+                self.diagram_cache.put(puml_path, svg_path(puml_path), svg_text)
+        evicted = self.diagram_cache.evict()
+        self.logger.info(
+            f"* Diagram cache: {len(diagrams)} hits, {len(rendered)} misses, {evicted} evicted"
+        )
+        diagrams.update(rendered)
+        return diagrams
+
+    def _inline_diagrams(self, errors: Dict[str, Optional[str]]):
+        diagrams = {}
+        for puml_path, error in errors.items():
+            diagrams[puml_path] = None
+            if error is not None:
+                continue
+            try:
+                with self.profiler.span("svg", file=svg_path(puml_path)):
+                    diagrams[puml_path] = inline_svg(svg_path(puml_path))
+            except Exception as e:
+                self.logger.error(
+                    f"* File '{svg_path(puml_path)}' not created due to PlantUML error: {e}",
+                    extra={
+                        "puml_file": puml_path,
+                        "svg_file": svg_path(puml_path),
+                        "error": str(e),
+                    },
+                )
+        return diagrams
+
+    def write_rdf(self, graph_name: str, graph: Graph, path: str):
+        """
+        Write the RDF file of a graph. A graph is serialized once per run, the
+        RDF files of its other languages are hard links to the first one, or
+        copies where hard links are not supported.
+
+        Args:
+            graph_name (str): Name of the graph.
+            graph (Graph): The graph to serialize.
+            path (str): Path of the RDF file.
+        """
+        serialized = self.serialized_graphs.get(graph_name)
+        if serialized is not None and (
+            os.path.abspath(serialized) == os.path.abspath(path)
+        ):
+            return
+        if os.path.lexists(path):
+            # never write through a link to the file of an earlier run
+            os.remove(path)
+        if serialized is not None and os.path.exists(serialized):
+            try:
+                os.link(serialized, path)
+            except OSError:
+                shutil.copyfile(serialized, path)
+        else:
+            with self.profiler.span("serialize", graph=graph_name, format=self.rdf_format):
+                graph.serialize(path, format=self.rdf_format, encoding="utf-8")
+            self.serialized_graphs[graph_name] = path
+        self.logger.info(f"* File '{path}' created")
+
+    def write_page(self, output_dir: str, md: Union[str, Iterable[str]]):
+        """
+        Write a rendered markdown page to the index.md of its output directory.
+
+        Args:
+            output_dir (str): Output directory of the page.
+            md (str | Iterable[str]): The rendered markdown, or its parts as they are rendered, see ShaclGraph.stream_md.
+        """
+        with open(f"{output_dir}/index.md", "w") as f:
+            f.writelines([md] if isinstance(md, str) else md)
+            f.write("\n")
+        self.logger.info(f"* File '{output_dir}/index.md' created")
+
+    def write_drafts(self, pages: List[tuple], diagrams: Dict[str, Optional[str]]):
+        """
+        Splice the rendered diagrams into the pages written with a placeholder, see ShaclGraph.draft_page.
+
+        Args:
+            pages (List[tuple]): The (output directory, PlantUML file) of each page; the PlantUML file is None for a page that has no placeholder.
+            diagrams (Dict[str, Optional[str]]): The SVG to inline per PlantUML file.
+        """
+        for output_dir, puml_path in pages:
+            if puml_path is not None:
+                self.splice_diagram(f"{output_dir}/index.md", str(diagrams[puml_path]))
+
+    def splice_diagram(self, path: str, svg_text: str):
+        """
+        Replace the diagram placeholder of a written page by the diagram.
+
+        The page is copied line by line to a temporary file, which then
+        replaces it, so the page is never held in memory.
+
+        Args:
+            path (str): Path of the page.
+            svg_text (str): The SVG to inline.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with open(path) as page, os.fdopen(fd, "w") as f:
+                for line in page:
+                    before, placeholder, after = line.partition(DIAGRAM_PLACEHOLDER)
+                    if placeholder:
+                        f.writelines((before, svg_text, after))
+                        break
+                    f.write(line)
+                shutil.copyfileobj(page, f)
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _generate_parallel(self, exclude: list, jobs: int, **shacls) -> List[tuple]:
+        # The graphs are parsed and extracted once, here. The workers are
+        # forked, so they share the models copy-on-write instead of re-parsing.
+        self.load_shacl_graphs(**shacls)
+        units = [
+            (shacl, lang)
+            for shacl in self.graphs.keys()
+            for lang in self.languages
+            if (shacl, lang) not in self.skipped_units
+            and shacl not in exclude
+            and shacl != "exclude"
+        ]
+        validated = self.graphs_to_validate() if self.shacl_shacl_validation else []
+        if not units and not validated:
+            return []
+        # each graph is serialized once, here, the workers link to its file
+        for shacl, lang in units:
+            if shacl not in self.serialized_graphs:
+                ShaclGraph(shacl, lang, self).write_rdf()
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(self,),
+        ) as executor:
+            # the graphs are validated while the pages are generated
+            validations = [executor.submit(_validate_graph, name) for name in validated]
+            # results are collected in unit order, which keeps the log deterministic
+            pages = []
+            for page, records, spans in executor.map(
+                _generate_unit, [shacl for shacl, _ in units], [lang for _, lang in units]
+            ):
+                for record in records:
+                    self.logger.handle(record)
+                self.profiler.merge(spans)
+                pages.append(page)
+            for name, validation in zip(validated, validations):
+                report, records, spans = validation.result()
+                for record in records:
+                    self.logger.handle(record)
+                self.profiler.merge(spans)
+                self.validation_reports[name] = ValidationReport.from_dict(report)
+
+        diagrams = self.render_diagrams(
+            [puml_path for _, puml_path in pages if puml_path is not None]
+        )
+        self.write_drafts(pages, diagrams)
+        return [
+            (
+                shacl,
+                lang,
+                output_dir,
+                puml_path is None or diagrams[puml_path] is not None,
+            )
+            for (shacl, lang), (output_dir, puml_path) in zip(units, pages)
+        ]
+
+    async def agenerate(self, exclude: list = None, concurrency: int = 2, **shacls):
+        """
+        Generate markdown documentation from SHACL files, without blocking the event loop.
+
+        The pages are built one by one in a worker thread. Their diagrams are
+        handed to PlantUML as soon as a page is built, while the next pages are
+        being built, and spliced into the pages once rendered. Every PlantUML
+        process renders all diagrams that are waiting when it starts.
+
+        Args:
+            exclude: list of graph names for which docs should not be generated
+            concurrency: maximum number of PlantUML processes running at the same time. Defaults to 2.
+            **shacls: Dictionary of SHACL files or Graphs to generate documentation for. The key is the name of the SHACL graph, the value is the filename of the SHACL file.
+
+        Examples:
+            >>> import asyncio
+            >>> from shacl2md import ShaclMarkdownGenerator
+            >>> sh_md = ShaclMarkdownGenerator(["nl", "en"], "./output")
+            >>> asyncio.run(
+            ...     sh_md.agenerate(
+            ...         organizations="/path_to_shacl/organizations.shacl.ttl",
+            ...         description="/path_to_shacl/description.shacl.ttl",
+            ...     )
+            ... )
+        """
+        if not exclude:
+            exclude = []
+        loop = asyncio.get_running_loop()
+        # rdflib and jinja are not async, they run in a single worker thread so
+        # the graphs are never read and serialized concurrently
+        executor = ThreadPoolExecutor(max_workers=1)
+        semaphore = asyncio.Semaphore(concurrency)
+        renders: List[asyncio.Task] = []
+        pages: List[tuple] = []
+
+        async def render(pages: List[tuple]):
+            async with semaphore:
+                diagrams = await self.arender_diagrams(
+                    [puml_path for _, puml_path in pages if puml_path is not None]
+                )
+            await loop.run_in_executor(executor, self.write_drafts, pages, diagrams)
+
+        try:
+            await loop.run_in_executor(
+                executor, functools.partial(self.load_shacl_graphs, **shacls)
+            )
+            for shacl in self.graphs.keys():
+                for lang in self.languages:
+                    shacl_graph = await loop.run_in_executor(
+                        executor, ShaclGraph, shacl, lang, self
+                    )
+                    if shacl not in exclude and shacl != "exclude":
+                        pages.append(
+                            await loop.run_in_executor(executor, shacl_graph.draft_page)
+                        )
+                    if sum(not r.done() for r in renders) < concurrency and pages:
+                        renders.append(asyncio.ensure_future(render(pages)))
+                        pages = []
+                if self.shacl_shacl_validation:
+                    await loop.run_in_executor(executor, shacl_graph.validate)
+            if pages:
+                renders.append(asyncio.ensure_future(render(pages)))
+            await asyncio.gather(*renders)
+        finally:
+            # after an error, the diagrams still rendering are not waited for
+            for r in renders:
+                r.cancel()
+            await asyncio.gather(*renders, return_exceptions=True)
+            executor.shutdown(wait=True)
+
+    def reload(self, changed_files: List[str], **shacls) -> List[str]:
+        """
+        Parse changed files again and update the graphs and models depending on them.
+
+        Unchanged files are not parsed again, their triples are kept in memory.
+
+        Args:
+            changed_files (List[str]): The changed SHACL and ontology files.
+            **shacls: Dictionary of SHACL files or Graphs, as passed to generate.
+
+        Returns:
+            List[str]: The names of the graphs whose pages have to be generated again.
+        """
+        changed_files = [os.path.abspath(path) for path in changed_files]
+
+        def changed(sources) -> bool:
+            if not isinstance(sources, list):
+                sources = [sources]
+            return any(
+                isinstance(source, str) and os.path.abspath(source) in changed_files
+                for source in sources
+            )
+
+        changed_graphs = [shacl for shacl, s in shacls.items() if changed(s)]
+        if changed(self.ontology_sources):
+            self.reload_ontology_graphs()
+            self.load_shacl_graphs(**shacls)
+            return list(shacls.keys())
+
+        self.load_shacl_graphs(**{shacl: shacls[shacl] for shacl in changed_graphs})
+        if changed_graphs and (self.crosslink_between_graphs or self.prune_ontology):
+            # crosslinks and a pruned ontology depend on every graph
+            return list(shacls.keys())
+        return changed_graphs
+
+    def watch(self, exclude: list = None, interval: float = 1.0, **shacls) -> None:
+        """
+        Generate markdown documentation from SHACL files, and generate it again
+        whenever one of the files changes, until interrupted.
+
+        The graphs stay in memory. Only a changed file is parsed again, and only
+        the pages of the graphs depending on it are generated again.
+
+        Args:
+            exclude: list of graph names for which docs should not be generated
+            interval: seconds between two checks of the modification times of the files. Defaults to 1.0.
+            **shacls: Dictionary of SHACL files or Graphs to generate documentation for. The key is the name of the SHACL graph, the value is the filename of the SHACL file.
+        """
+        if not exclude:
+            exclude = []
+        self.generate(exclude=exclude, **shacls)
+
+        files = [
+            source
+            for sources in list(shacls.values()) + [self.ontology_sources]
+            for source in (sources if isinstance(sources, list) else [sources])
+            # URLs cannot be watched
+            if isinstance(source, str) and os.path.isfile(source)
+        ]
+
+        def modification_times() -> dict:
+            mtimes = {}
+            for path in files:
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    # a file that is being replaced by an editor
+                    mtimes[path] = None
+            return mtimes
+
+        mtimes = modification_times()
+        self.logger.info(f"* Watching {len(files)} files for changes")
+        try:
+            while True:
+                time.sleep(interval)
+                current = modification_times()
+                changed_files = [
+                    path
+                    for path in files
+                    if current[path] != mtimes[path] and current[path] is not None
+                ]
+                if not changed_files:
+                    continue
+                mtimes = current
+                start = time.perf_counter()
+                try:
+                    graph_names = self.reload(changed_files, **shacls)
+                    self.skipped_units = {
+                        (shacl, lang)
+                        for shacl in self.graphs.keys()
+                        for lang in self.languages
+                        if shacl not in graph_names
+                    }
+                    self._write_pages(self.build_shacl_graphs(), exclude)
+                except Exception as e:
+                    # keep watching, the file is likely being edited
+                    self.logger.error(f"* Rebuild failed: {e}")
+                    continue
+                finally:
+                    self.skipped_units = set()
+                self.logger.info(
+                    f"* Rebuilt {', '.join(graph_names)} after changes to {', '.join(changed_files)} in {time.perf_counter() - start:.2f}s"
+                )
+        except KeyboardInterrupt:
+            self.logger.info("* Stopped watching")
 
 
 class ShaclSnippetGenerator(Generator):
@@ -216,6 +1146,10 @@ class ShaclSnippetGenerator(Generator):
         shacl_shacl_validation: bool = False,
         ontology_graphs: List[Union[str, Graph]] = None,
         logger: Logger = None,
+        prune_ontology: bool = False,
+        cache_dir: str = None,
+        profile: bool = False,
+        query_stats: bool = False,
     ):
         """
         A shacl snippet generator object.
@@ -226,9 +1160,21 @@ class ShaclSnippetGenerator(Generator):
             shacl_shacl_validation (bool, optional): Validate the SHACL files against the SHACL specification. Defaults to False.
             ontology_graphs (List[str | Graph], optional): List of ontology files or Graphs, to include with the SHACL shapes, e.g., class definitions or reasoning. Defaults to [].
             logger (Logger, optional): logging.Logger. Defaults to None.
+            prune_ontology (bool, optional): Only keep the labels, descriptions, types and superclasses of the IRIs referenced by the SHACL graphs, and of their superclasses, from the ontology graphs. Defaults to False.
+            cache_dir (str, optional): Directory of the persistent cache of parsed files. Defaults to None, files are then only parsed once per run.
+            profile (bool, optional): Record how long the phases of the build take, per graph and language, see Profiler. Defaults to False.
+            query_stats (bool, optional): Collect statistics of the queries and lookups that extract the models, see QueryStats. Defaults to False.
         """
         super().__init__(
-            languages, output_dir, shacl_shacl_validation, ontology_graphs, logger
+            languages,
+            output_dir,
+            shacl_shacl_validation,
+            ontology_graphs,
+            logger,
+            prune_ontology,
+            cache_dir,
+            profile,
+            query_stats,
         )
 
     def generate(self, **shacls):
@@ -251,7 +1197,10 @@ class ShaclSnippetGenerator(Generator):
         """
         shacl_graphs: List[ShaclGraph] = self.add_shacl_graphs(**shacls)
         for shacl_graph in shacl_graphs:
-            shacl_graph.generate_vscode_snippet()
+            with self.profiler.span(
+                "snippet", graph=shacl_graph.name, lang=shacl_graph.lang
+            ):
+                shacl_graph.generate_vscode_snippet()
 
 
 class ShaclGraph:
@@ -275,115 +1224,169 @@ class ShaclGraph:
         self.name = name
         self.lang = lang
         self.generator = generator
-        self.graph: Graph = generator.get_graph(name)
-        self.graph += generator.ontology_graph
+        self.model: ShaclModel = generator.get_model(name)
+        self.graph: Graph = self.model.graph
         self.doc = self._get_doc()
         self.output_dir, self.output_dir_length = self._generate_output_dir()
         self.namespaces = self.graph.namespace_manager.namespaces()
-        self.classes = list(self._get_classes())
+
+    def release_classes(self):
+        """
+        Release the classes of a written page. They are extracted again when used.
+        """
+        self.__dict__.pop("class_dicts", None)
+
+    @functools.cached_property
+    def class_dicts(self) -> list:
+        """
+        The classes as the templates use them, extracted and converted once per
+        page, when the page is first rendered. The classes are converted as
+        they are extracted, only their dicts are kept. Pages that are not
+        rendered, e.g., only validated, extract no classes.
+        """
+        with self.generator.profiler.span("classes", graph=self.name, lang=self.lang):
+            return [c.to_dict() for c in self._get_classes()]
+
+    def write_puml(self) -> str:
+        """
+        Write the PlantUML diagram of the SHACL graph.
+
+        Returns:
+            str: Path of the PlantUML file.
+        """
+        puml_path = f"{self.output_dir}/{self.name}-diagram.puml"
+        classes = self.class_dicts
+        with self.generator.profiler.span(
+            "puml", graph=self.name, lang=self.lang
+        ), open(puml_path, "w") as f:
+            self.generator.puml_template.stream(
+                namespaces=self.namespaces,
+                classes=classes,
+                output_dir_length=self.output_dir_length,
+            ).dump(f)
+            f.write("\n")
+        self.generator.logger.info(f"* File '{puml_path}' created")
+        return puml_path
 
     def generate_puml(self):
         """
-        Generate a PlantUML diagram from the SHACL graph.
+        Generate a PlantUML diagram from the SHACL graph and render it to SVG.
+
+        Returns:
+            str: The SVG to inline, None if it could not be rendered.
+        """
+        puml_path = self.write_puml()
+        return self.generator.render_diagrams([puml_path])[puml_path]
+
+    def write_md(self, svg_text: Optional[str]):
+        """
+        Dump the RDF serialization and write the markdown documentation as it is rendered.
+
+        Args:
+            svg_text (str): The SVG, or the Mermaid code, of the diagram to inline.
+        """
+        with self.generator.profiler.span("render", graph=self.name, lang=self.lang):
+            self.generator.write_page(self.output_dir, self.stream_md(svg_text))
+
+    def stream_md(
+        self, svg_text: Optional[str], rdf_filename: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Dump the RDF serialization and render the markdown documentation part
+        by part, to be written as it is rendered.
+
+        Args:
+            svg_text (str): The SVG, or the Mermaid code, of the diagram to inline.
+            rdf_filename (str, optional): Name of the RDF file, when it is already written. Defaults to None, the RDF file is then written, see write_rdf.
         """
-        puml_filename = f"{self.name}-diagram.puml"
-        svg_filename = f"{self.name}-diagram.svg"
+        if rdf_filename is None:
+            rdf_filename = self.write_rdf()
+
+        other_languages = self.generator.filter_language(self.lang)
+
+        # Get markdown labels
+        labels = get_lang_labels(self.lang)
 
-        # Generate PUML diagram
-        code = self.generator.puml_template.render(
+        return self.generator.template.generate(
+            frontmatter={
+                "layout": self.generator.jekyll_layout,
+                "title": self.doc.title,
+                "parent": self.generator.jekyll_parent_page,
+                "nav_order": self.generator.jekyll_nav_order,
+                "nav_exclude": self.generator.languages[0] != self.lang,
+            },
+            rdf_filename=rdf_filename,
+            doc=self.doc,
             namespaces=self.namespaces,
-            classes=[c.to_dict() for c in self.classes],
+            classes=self.class_dicts,
+            diagramText=svg_text,
+            diagram_backend=self.generator.diagram_backend,
+            languages=other_languages,
             output_dir_length=self.output_dir_length,
+            labels=labels,
         )
-        print(
-            code,
-            file=open(f"{self.output_dir}/{puml_filename}", "w"),
-        )
-        self.generator.logger.info(
-            f"* File '{self.output_dir}/{puml_filename}' created"
+
+    def write_rdf(self) -> str:
+        """
+        Write the RDF file of the SHACL graph next to the documentation.
+
+        Returns:
+            str: Name of the RDF file.
+        """
+        rdf_filename = f"{self.name}.shacl.{RDF_FORMATS[self.generator.rdf_format]}"
+        self.generator.write_rdf(
+            self.name,
+            self.model.graph if self.generator.rdf_shapes_only else self.model.view,
+            f"{self.output_dir}/{rdf_filename}",
         )
+        return rdf_filename
 
-        # Render PUML diagram
-        try:
-            jar_path = os.path.join(
-                os.path.realpath(os.path.dirname(__file__)), "plantuml.jar"
-            )
-            retcode = subprocess.call(
-                [
-                    "java",
-                    "-jar",
-                    jar_path,
-                    f"{self.output_dir}/{puml_filename}",
-                    "-svg",
-                    "-o",
-                    abspath(self.output_dir),
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
+    def draft_page(self) -> tuple:
+        """
+        Write the PlantUML diagram and write the markdown documentation, as it
+        is rendered, with a placeholder for the diagram, to be rendered and
+        spliced in later, see Generator.write_drafts. Other diagram backends
+        need no rendering step, their page is written in full.
 
-            if retcode > 0:
-                raise
-
-            # Extract PUML SVG string
-            parser = etree.XMLParser(ns_clean=True, remove_comments=True)
-            tree = etree.parse(f"{self.output_dir}/{svg_filename}", parser)
-            tree.getroot().attrib.pop("width")
-            tree.getroot().attrib.pop("height")
-            tree.getroot().attrib.pop("style")
-            svg_text = etree.tostring(
-                tree.getroot(), encoding="unicode", xml_declaration=False
-            )
-            return svg_text
-        except Exception as e:
-            self.generator.logger.error(
-                f"* File '{self.output_dir}/{svg_filename}' not created due to PlantUML error: {e}"
+        Returns:
+            (str, str): The output directory and the PlantUML file (None without placeholder).
+        """
+        if self.generator.diagram_backend != "plantuml":
+            self.write_md(self.render_diagram())
+            return self.output_dir, None
+        puml_path = self.write_puml()
+        self.write_md(DIAGRAM_PLACEHOLDER)
+        return self.output_dir, puml_path
+
+    def render_diagram(self) -> Optional[str]:
+        """
+        Render the Mermaid class diagram, or None with the "none" diagram backend.
+        """
+        if self.generator.diagram_backend == "none":
+            return None
+        classes = self.class_dicts
+        with self.generator.profiler.span("mermaid", graph=self.name, lang=self.lang):
+            return self.generator.mermaid_template.render(
+                classes=classes,
             )
-            # raise e
 
     def generate_md(self):
         """
         Generate markdown documentation from the SHACL graph.
         """
-        svg_text = self.generate_puml()
-        # Dump RDF serialization to file
-        rdf_filename = f"{self.name}.shacl.ttl"
-        self.graph.serialize(f"{self.output_dir}/{rdf_filename}")
-        self.generator.logger.info(f"* File '{self.output_dir}/{rdf_filename}' created")
-
-        other_languages = self.generator.filter_language(self.lang)
-
-        # Get markdown labels
-        labels = get_lang_labels(self.lang)
-
-        print(
-            self.generator.template.render(
-                frontmatter={
-                    "layout": self.generator.jekyll_layout,
-                    "title": self.doc.title,
-                    "parent": self.generator.jekyll_parent_page,
-                    "nav_order": self.generator.jekyll_nav_order,
-                    "nav_exclude": self.generator.languages[0] != self.lang,
-                },
-                rdf_filename=rdf_filename,
-                doc=self.doc,
-                namespaces=self.namespaces,
-                classes=[c.to_dict() for c in self.classes],
-                diagramText=svg_text,
-                languages=other_languages,
-                output_dir_length=self.output_dir_length,
-                labels=labels,
-            ),
-            file=open(f"{self.output_dir}/index.md", "w"),
-        )
-        self.generator.logger.info(f"* File '{self.output_dir}/index.md' created")
+        if self.generator.diagram_backend == "plantuml":
+            diagram_text = self.generate_puml()
+        else:
+            diagram_text = self.render_diagram()
+        self.write_md(diagram_text)
 
     def generate_vscode_snippet(self):
         """
         Generate Snippets for triples in VSCODE
         """
         snippet_json = {}
-        for rdf_class in self.classes:
+        # one pass over the classes, they are not kept
+        for rdf_class in self._get_classes():
             if not rdf_class.properties:
                 continue
             snippet_json[f"({self.name}){rdf_class.shortname}"] = {
@@ -418,27 +1421,31 @@ class ShaclGraph:
             self.generator.logger.info(f"Generated snippet for {self.name}")
 
     def _get_classes(self):
-        crosslink_graphs = []
+        class_index = None
         try:
             if self.generator.crosslink_between_graphs:
-                crosslink_graphs = self.generator.filter_graph(self.name)
+                class_index = self.generator.class_index
         except AttributeError:
             pass
-        for c in self.graph.query(
-            GET_CLASSES, initBindings={"lang": Literal(self.lang)}
-        ):
-            c = RDFClass(
-                self.lang,
-                c.iri,
-                to_shortname(self.graph, c.iri),
-                c.label,
-                c.description,
-            )
-            c.check_crosslink(self.graph, crosslink_graphs)
-            c.get_properties(self.graph, crosslink_graphs)
-            c.get_subclasses(self.graph)
-            c.get_superclasses(self.graph)
-            yield c
+        try:
+            for iri in order_by_label(
+                self.model.classes, lambda iri: self.model.class_label(iri, self.lang)
+            ):
+                c = RDFClass(
+                    self.lang,
+                    iri,
+                    to_shortname(self.graph, iri),
+                    self.model.class_label(iri, self.lang),
+                    self.model.class_description(iri, self.lang),
+                )
+                c.check_crosslink(self.model, class_index)
+                c.get_properties(self.model, class_index)
+                c.get_subclasses(self.model)
+                c.get_superclasses(self.model, self.generator.class_registry)
+                yield c
+        finally:
+            # no other page references the superclasses of this one
+            self.generator.class_registry.forget(self.name, self.lang)
 
     def _generate_output_dir(self):
         base_output_dir = self.generator.output_dir
@@ -455,7 +1462,7 @@ class ShaclGraph:
                     output_dir = f"{base_output_dir}/{self.doc.version}"
 
                 if not os.path.exists(base_output_dir):
-                    os.mkdir(base_output_dir)
+                    os.makedirs(base_output_dir, exist_ok=True)
                 self.generator.logger.info(f"* Directory '{base_output_dir}' created")
                 output_dir_length += 1
             else:
@@ -466,27 +1473,16 @@ class ShaclGraph:
             output_dir = base_output_dir
 
         if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+            os.makedirs(output_dir, exist_ok=True)
             self.generator.logger.info(f"* Directory '{output_dir}' created")
         return output_dir, output_dir_length
 
     def _get_doc(self):
-        for row in self.graph.query(
-            GET_DOC_MD, initBindings={"lang": Literal(self.lang)}
-        ):
-            row.authors = list(self.graph.query(GET_AUTHORS))
-            return row
+        with self.generator.profiler.span("doc", graph=self.name, lang=self.lang):
+            return self.model.get_doc(self.lang)
 
-    def validate(self):
+    def validate(self) -> ValidationReport:
         """
-        Validate the SHACL graph against the SHACL specification.
+        Validate the SHACL graph against the SHACL specification, see Generator.validate_graph.
         """
-        r = validate(
-            self.graph,
-            shacl_graph="http://www.w3.org/ns/shacl-shacl",
-            abort_on_first=True,
-            allow_infos=True,
-            allow_warnings=True,
-        )
-        conforms, results_graph, results_text = r
-        self.generator.logger.info(f"* {results_text}")
+        return self.generator.validate_graph(self.name)
@@ -0,0 +1,577 @@
+import hashlib
+import importlib.metadata
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from typing import List, Optional
+
+import jinja2
+import rdflib
+from jinja2 import FileSystemBytecodeCache
+from rdflib.graph import Graph
+
+from shacl2md.utilities.config import DIAGRAM_CACHE_SIZE
+
+# Bump when the layout of a cache entry changes.
+CACHE_FORMAT = "2"
+
+
+def file_hash(path: str) -> str:
+    """
+    Get the SHA-256 hash of the content of a file.
+
+    Args:
+        path (str): Path of the file.
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def write_atomic(path: str, data: bytes):
+    """
+    Write a file by renaming a temporary file, so readers never see a partial file.
+
+    Args:
+        path (str): Path of the file.
+        data (bytes): The content of the file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class _TripleSink(Graph):
+    """
+    Collects the triples emitted by a parser in order, without indexing them,
+    optionally only those of some predicates.
+    """
+
+    def __init__(self, predicates: Optional[frozenset] = None):
+        super().__init__(bind_namespaces="none")
+        self.predicates: Optional[frozenset] = predicates
+        self.parsed_triples: list = []
+        self.parsed: int = 0
+
+    def add(self, triple):
+        self.parsed += 1
+        if self.predicates is None or triple[1] in self.predicates:
+            self.parsed_triples.append(triple)
+        return self
+
+    def addN(self, quads):
+        triples = [(s, p, o) for s, p, o, _ in quads]
+        self.parsed += len(triples)
+        if self.predicates is not None:
+            triples = [t for t in triples if t[1] in self.predicates]
+        self.parsed_triples.extend(triples)
+        return self
+
+    def entry(self) -> tuple:
+        return list(self.namespaces()), self.parsed_triples, self.parsed
+
+
+class ParseCache:
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        A cache of parsed RDF files.
+
+        A file is parsed at most once per run. When a cache directory is
+        given, the parsed triples are also stored on disk as a pickle, keyed
+        by the file path, the hash of its content and the rdflib version, so
+        later runs skip the parser as well. Sources that are not local files,
+        e.g., URLs, are parsed every time.
+
+        Args:
+            cache_dir (str, optional): Directory of the persistent cache. Defaults to None, in which case nothing is stored on disk.
+        """
+        self.cache_dir: Optional[str] = cache_dir
+        self.entries: dict = {}
+        self.paths: dict = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def key(self, path: str, predicates: Optional[frozenset] = None) -> str:
+        """
+        Get the cache key of a file.
+
+        Args:
+            path (str): Path of the file.
+            predicates (frozenset, optional): The only predicates that are kept. Defaults to None, all predicates.
+        """
+        sha = hashlib.sha256()
+        for part in (
+            CACHE_FORMAT,
+            rdflib.__version__,
+            os.path.abspath(path),
+            file_hash(path),
+            "" if predicates is None else " ".join(sorted(predicates)),
+        ):
+            sha.update(part.encode())
+            sha.update(b"\0")
+        return sha.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def get(
+        self, path: str, memoize: bool = True, predicates: Optional[frozenset] = None
+    ) -> tuple:
+        """
+        Get the namespaces and triples of a file, parsing it if it is not cached.
+
+        Args:
+            path (str): Path of the RDF file.
+            memoize (bool, optional): Keep the parsed file in memory for the rest of the run. Defaults to True.
+            predicates (frozenset, optional): Only keep the triples of these predicates, they are dropped as the parser emits them, before they are cached. Defaults to None, all triples.
+
+        Returns:
+            (list, list, int): The (prefix, namespace) bindings, the triples of the file and the number of triples parsed, the dropped ones included.
+        """
+        if not os.path.isfile(path):
+            self.misses += 1
+            sink = _TripleSink(predicates)
+            sink.parse(path)
+            return sink.entry()
+
+        key = self.key(path, predicates)
+        if key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+
+        entry = None
+        if self.cache_dir is not None and os.path.exists(self.entry_path(key)):
+            try:
+                with open(self.entry_path(key), "rb") as f:
+                    entry = pickle.load(f)
+                self.hits += 1
+            except (OSError, EOFError, pickle.UnpicklingError):
+                entry = None
+        if entry is None:
+            self.misses += 1
+            sink = _TripleSink(predicates)
+            sink.parse(path)
+            entry = sink.entry()
+            if self.cache_dir is not None:
+                self.store(key, entry)
+        if memoize:
+            # a changed file replaces its earlier entry
+            previous_key = self.paths.get(os.path.abspath(path))
+            if previous_key is not None and previous_key != key:
+                self.entries.pop(previous_key, None)
+            self.paths[os.path.abspath(path)] = key
+            self.entries[key] = entry
+        return entry
+
+    def store(self, key: str, entry: tuple):
+        """
+        Write an entry to the cache directory, atomically.
+
+        Args:
+            key (str): The cache key.
+            entry (tuple): The namespaces and triples to store.
+        """
+        write_atomic(
+            self.entry_path(key),
+            pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+    def load(self, path: str, g: Graph, memoize: bool = True) -> Graph:
+        """
+        Add the triples and namespace bindings of a file to a graph.
+
+        Args:
+            path (str): Path of the RDF file.
+            g (Graph): The graph to add the file to.
+            memoize (bool, optional): Keep the parsed file in memory for the rest of the run. Defaults to True.
+        """
+        if not os.path.isfile(path):
+            # URLs and other sources rdflib reads are not cached
+            return g.parse(path)
+        namespaces, triples, _ = self.get(path, memoize)
+        g.addN((s, p, o, g) for s, p, o in triples)
+        for name, uri in namespaces:
+            g.bind(name, uri)
+        return g
+
+    def warm(self, paths: List[str]) -> List[str]:
+        """
+        Parse files into the cache directory.
+
+        Args:
+            paths (List[str]): Paths of the RDF files.
+
+        Returns:
+            List[str]: The paths that had to be parsed.
+        """
+        parsed = []
+        for path in paths:
+            misses = self.misses
+            self.get(path, memoize=False)
+            if self.misses > misses:
+                parsed.append(path)
+        return parsed
+
+    def files(self) -> List[str]:
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, name)
+            for name in sorted(os.listdir(self.cache_dir))
+            if name.endswith(".pickle")
+        ]
+
+    def clear(self) -> int:
+        """
+        Remove all entries from the cache directory.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        files = self.files()
+        for path in files:
+            os.remove(path)
+        self.entries = {}
+        self.paths = {}
+        return len(files)
+
+    def size(self) -> int:
+        """
+        Get the total size of the cache directory in bytes.
+        """
+        return sum(os.path.getsize(path) for path in self.files())
+
+
+class DiagramCache:
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        jar_path: str,
+        max_size: int = DIAGRAM_CACHE_SIZE,
+    ):
+        """
+        A content-addressed cache of rendered PlantUML diagrams.
+
+        A diagram is keyed by the hash of its PlantUML text, the PlantUML jar
+        and the theme. The rendered SVG and its inline form are stored in the
+        `svg` folder of the cache directory. The least recently used diagrams
+        are evicted when the folder grows beyond max_size.
+
+        Args:
+            cache_dir (str, optional): Cache directory. None disables the cache.
+            jar_path (str): Path of the PlantUML jar.
+            max_size (int, optional): Size cap in bytes. Defaults to DIAGRAM_CACHE_SIZE.
+        """
+        self.cache_dir: Optional[str] = (
+            None if cache_dir is None else os.path.join(cache_dir, "svg")
+        )
+        self.jar_path: str = jar_path
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._jar_version: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    @property
+    def jar_version(self) -> str:
+        # the jar can be any downloaded release, its content identifies it
+        if self._jar_version is None:
+            self._jar_version = (
+                file_hash(self.jar_path) if os.path.exists(self.jar_path) else ""
+            )
+        return self._jar_version
+
+    def key(self, puml_path: str) -> str:
+        """
+        Get the cache key of a PlantUML file.
+
+        Args:
+            puml_path (str): Path of the PlantUML file.
+        """
+        with open(puml_path, "rb") as f:
+            puml = f.read()
+        theme = re.search(rb"^!theme\s+(\S+)", puml, re.MULTILINE)
+        sha = hashlib.sha256()
+        for part in (
+            CACHE_FORMAT.encode(),
+            self.jar_version.encode(),
+            theme.group(1) if theme else b"",
+            puml,
+        ):
+            sha.update(part)
+            sha.update(b"\0")
+        return sha.hexdigest()
+
+    def entry_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def get(self, puml_path: str, svg_path: str) -> Optional[str]:
+        """
+        Copy a cached diagram to svg_path.
+
+        Args:
+            puml_path (str): Path of the PlantUML file.
+            svg_path (str): Path to copy the SVG to.
+
+        Returns:
+            str: The inline form of the SVG, None if the diagram is not cached.
+        """
+        if not self.enabled:
+            return None
+        key = self.key(puml_path)
+        try:
+            with open(self.entry_path(key, ".inline.svg"), encoding="utf-8") as f:
+                svg_text = f.read()
+            shutil.copyfile(self.entry_path(key, ".svg"), svg_path)
+        except OSError:
+            self.misses += 1
+            return None
+        # the modification time records the last use, see evict
+        for suffix in (".svg", ".inline.svg"):
+            os.utime(self.entry_path(key, suffix))
+        self.hits += 1
+        return svg_text
+
+    def put(self, puml_path: str, svg_path: str, svg_text: str):
+        """
+        Store a rendered diagram.
+
+        Args:
+            puml_path (str): Path of the PlantUML file.
+            svg_path (str): Path of the rendered SVG.
+            svg_text (str): The inline form of the SVG.
+        """
+        if not self.enabled:
+            return
+        key = self.key(puml_path)
+        with open(svg_path, "rb") as f:
+            write_atomic(self.entry_path(key, ".svg"), f.read())
+        write_atomic(self.entry_path(key, ".inline.svg"), svg_text.encode("utf-8"))
+
+    def files(self) -> List[str]:
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, name)
+            for name in sorted(os.listdir(self.cache_dir))
+            if name.endswith(".svg")
+        ]
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used diagrams until the cache fits max_size.
+
+        Returns:
+            int: The number of removed diagrams.
+        """
+        entries: dict = {}
+        for path in self.files():
+            key = os.path.basename(path).split(".", 1)[0]
+            stat = os.stat(path)
+            last_used, size = entries.get(key, (0, 0))
+            entries[key] = (max(last_used, stat.st_mtime), size + stat.st_size)
+        total = sum(size for _, size in entries.values())
+        removed = 0
+        for key, (_, size) in sorted(entries.items(), key=lambda e: e[1][0]):
+            if total <= self.max_size:
+                break
+            for suffix in (".svg", ".inline.svg"):
+                if os.path.exists(self.entry_path(key, suffix)):
+                    os.remove(self.entry_path(key, suffix))
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove all diagrams from the cache.
+
+        Returns:
+            int: The number of removed files.
+        """
+        files = self.files()
+        for path in files:
+            os.remove(path)
+        return len(files)
+
+    def size(self) -> int:
+        """
+        Get the total size of the cached diagrams in bytes.
+        """
+        return sum(os.path.getsize(path) for path in self.files())
+
+
+class ValidationCache:
+    def __init__(self, cache_dir: Optional[str]):
+        """
+        A cache of SHACL-SHACL validation reports, see ValidationReport.
+
+        A report is keyed by the hash of the content of the files of its
+        graph and the pyshacl version, and stored as JSON in the `validation`
+        folder of the cache directory. Graphs that are not read from local
+        files, e.g., Graphs or URLs, are not cached.
+
+        Args:
+            cache_dir (str, optional): Cache directory. None disables the cache.
+        """
+        self.cache_dir: Optional[str] = (
+            None if cache_dir is None else os.path.join(cache_dir, "validation")
+        )
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_dir is not None
+
+    def key(self, sources: list) -> Optional[str]:
+        """
+        Get the cache key of a graph, None if it cannot be cached.
+
+        Args:
+            sources (list): The files or Graphs the graph was loaded from.
+        """
+        if (
+            not self.enabled
+            or not sources
+            or not all(isinstance(s, str) and os.path.isfile(s) for s in sources)
+        ):
+            return None
+        try:
+            pyshacl_version = importlib.metadata.version("pyshacl")
+        except importlib.metadata.PackageNotFoundError:
+            pyshacl_version = ""
+        sha = hashlib.sha256()
+        for part in [CACHE_FORMAT, pyshacl_version] + [file_hash(s) for s in sources]:
+            sha.update(part.encode())
+            sha.update(b"\0")
+        return sha.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: Optional[str]) -> Optional[dict]:
+        """
+        Get a cached report, see ValidationReport.to_dict.
+
+        Args:
+            key (str, optional): Cache key of the graph, see key.
+        """
+        if key is not None:
+            try:
+                with open(self.entry_path(key), encoding="utf-8") as f:
+                    report = json.load(f)
+                self.hits += 1
+                return report
+            except (OSError, ValueError):
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, key: Optional[str], report: dict):
+        """
+        Store a report, see ValidationReport.to_dict.
+
+        Args:
+            key (str, optional): Cache key of the graph, see key.
+            report (dict): The report.
+        """
+        if key is not None:
+            write_atomic(self.entry_path(key), json.dumps(report).encode("utf-8"))
+
+    def files(self) -> List[str]:
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, name)
+            for name in sorted(os.listdir(self.cache_dir))
+            if name.endswith(".json")
+        ]
+
+    def clear(self) -> int:
+        """
+        Remove all reports from the cache.
+
+        Returns:
+            int: The number of removed files.
+        """
+        files = self.files()
+        for path in files:
+            os.remove(path)
+        return len(files)
+
+    def size(self) -> int:
+        """
+        Get the total size of the cached reports in bytes.
+        """
+        return sum(os.path.getsize(path) for path in self.files())
+
+
+class TemplateCache(FileSystemBytecodeCache):
+    def __init__(self, cache_dir: str):
+        """
+        A persistent cache of compiled templates, so a run loads the templates
+        instead of compiling them.
+
+        A template is keyed by its name and the Jinja version, its bytecode is
+        only used when the hash of the template source matches, so an edited
+        template is compiled again. The bytecode is stored in the `jinja`
+        folder of the cache directory.
+
+        Args:
+            cache_dir (str): Cache directory.
+        """
+        self.cache_dir: str = os.path.join(cache_dir, "jinja")
+        super().__init__(self.cache_dir, "%s.cache")
+
+    def get_cache_key(self, name: str, filename: Optional[str] = None) -> str:
+        return hashlib.sha256(
+            f"{CACHE_FORMAT}|{jinja2.__version__}|{name}".encode()
+        ).hexdigest()
+
+    def dump_bytecode(self, bucket):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        super().dump_bytecode(bucket)
+
+    def files(self) -> List[str]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, name)
+            for name in sorted(os.listdir(self.cache_dir))
+            if name.endswith(".cache")
+        ]
+
+    def clear(self) -> int:
+        """
+        Remove all compiled templates from the cache.
+
+        Returns:
+            int: The number of removed files.
+        """
+        files = self.files()
+        for path in files:
+            os.remove(path)
+        return len(files)
+
+    def size(self) -> int:
+        """
+        Get the total size of the compiled templates in bytes.
+        """
+        return sum(os.path.getsize(path) for path in self.files())
@@ -0,0 +1,17 @@
+import os
+
+# Settings that can be set through the environment. This module has no
+# dependencies, so it can be imported by the CLI without loading rdflib.
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SHACL2MD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "shacl2md")
+)
+
+# Size in bytes above which the least recently used diagrams are evicted.
+DIAGRAM_CACHE_SIZE = int(os.environ.get("SHACL2MD_DIAGRAM_CACHE_SIZE", 100 * 1024 * 1024))
+
+# Seconds PlantUML may spend on a single diagram.
+DIAGRAM_TIMEOUT = 60
+
+# Path of an existing PlantUML jar, used instead of the jar in the package folder.
+PLANTUML_JAR = os.environ.get("SHACL2MD_PLANTUML_JAR")
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+from shacl2md.utilities.cache import write_atomic
+
+# Bump when the layout of the manifest or of a fingerprint changes.
+MANIFEST_FORMAT = "1"
+
+MANIFEST_FILENAME = ".shacl2md-manifest.json"
+
+
+def fingerprint(inputs: dict) -> str:
+    """
+    Get the fingerprint of the inputs of a build unit.
+
+    Args:
+        inputs (dict): JSON serializable inputs, e.g., file hashes and options.
+    """
+    return hashlib.sha256(
+        json.dumps([MANIFEST_FORMAT, inputs], sort_keys=True).encode()
+    ).hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, output_dir: str):
+        """
+        The manifest of an incremental build.
+
+        It records the fingerprint of the inputs of every (graph, language)
+        unit that was built in the output directory, with the directory its
+        pages were written to.
+
+        Args:
+            output_dir (str): The base output directory, where the manifest is stored.
+        """
+        self.path: str = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.units: dict = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") == MANIFEST_FORMAT:
+                self.units = manifest["units"]
+        except (OSError, ValueError, KeyError):
+            # a missing or unreadable manifest rebuilds everything
+            self.units = {}
+
+    @staticmethod
+    def unit_key(graph_name: str, lang: str) -> str:
+        return f"{graph_name}/{lang}"
+
+    def is_fresh(self, graph_name: str, lang: str, unit_fingerprint: Optional[str]):
+        """
+        Check whether a unit was built from the same inputs and its pages still exist.
+
+        Args:
+            graph_name (str): Name of the graph.
+            lang (str): Language of the pages.
+            unit_fingerprint (str, optional): Fingerprint of the inputs, None if they cannot be fingerprinted.
+        """
+        unit = self.units.get(self.unit_key(graph_name, lang))
+        return (
+            unit_fingerprint is not None
+            and unit is not None
+            and unit["fingerprint"] == unit_fingerprint
+            and os.path.exists(os.path.join(unit["output_dir"], "index.md"))
+        )
+
+    def record(
+        self,
+        graph_name: str,
+        lang: str,
+        unit_fingerprint: Optional[str],
+        output_dir: str,
+    ):
+        """
+        Record a built unit.
+
+        Args:
+            graph_name (str): Name of the graph.
+            lang (str): Language of the pages.
+            unit_fingerprint (str, optional): Fingerprint of the inputs, None if they cannot be fingerprinted.
+            output_dir (str): Directory the pages were written to.
+        """
+        key = self.unit_key(graph_name, lang)
+        if unit_fingerprint is None:
+            self.units.pop(key, None)
+        else:
+            self.units[key] = {
+                "fingerprint": unit_fingerprint,
+                "output_dir": output_dir,
+            }
+
+    def save(self):
+        write_atomic(
+            self.path,
+            json.dumps(
+                {"format": MANIFEST_FORMAT, "units": self.units},
+                indent=2,
+                sort_keys=True,
+            ).encode("utf-8"),
+        )
@@ -0,0 +1,109 @@
+from typing import Iterable, Optional, Union
+
+from rdflib.graph import Graph
+from rdflib.namespace import RDF, RDFS, SKOS
+from rdflib.term import URIRef
+
+from shacl2md.utilities.cache import ParseCache
+
+# The only ontology predicates the generator reads.
+RELEVANT_PREDICATES = frozenset(
+    (RDFS.label, RDFS.comment, SKOS.definition, RDFS.subClassOf, RDF.type)
+)
+
+
+class PrunedGraph(Graph):
+    """
+    A graph that only stores the relevant ontology predicates.
+
+    Every other triple is dropped as the parser emits it, so a large
+    vocabulary is never held in memory in full.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parsed: int = 0
+
+    def add(self, triple):
+        self.parsed += 1
+        if triple[1] in RELEVANT_PREDICATES:
+            return super().add(triple)
+        return self
+
+    def addN(self, quads):
+        def relevant(quads):
+            for quad in quads:
+                self.parsed += 1
+                if quad[1] in RELEVANT_PREDICATES:
+                    yield quad
+
+        return super().addN(relevant(quads))
+
+    def load(
+        self,
+        ontology_graph: Union[str, Graph],
+        parse_cache: Optional[ParseCache] = None,
+    ):
+        """
+        Parse an ontology file or copy an ontology Graph into this graph.
+
+        Args:
+            ontology_graph (str | Graph): Ontology file or Graph to load.
+            parse_cache (ParseCache, optional): Cache to read parsed files from. Defaults to None.
+        """
+        if isinstance(ontology_graph, str):
+            if parse_cache is None or parse_cache.cache_dir is None:
+                self.parse(ontology_graph)
+            else:
+                # only the relevant triples are kept and cached, not memoized
+                namespaces, triples, parsed = parse_cache.get(
+                    ontology_graph, memoize=False, predicates=RELEVANT_PREDICATES
+                )
+                # added as they are, they are not counted again
+                super().addN((s, p, o, self) for s, p, o in triples)
+                self.parsed += parsed
+                for name, uri in namespaces:
+                    self.bind(name, uri)
+        elif isinstance(ontology_graph, Graph):
+            for triple in ontology_graph:
+                self.add(triple)
+            for name, uri in ontology_graph.namespaces():
+                self.bind(name, uri)
+
+    def prune(self, iris: Iterable[URIRef]):
+        """
+        Remove the triples about IRIs that are not in `iris` nor in their
+        superclass closure.
+
+        Args:
+            iris (Iterable[URIRef]): The IRIs to keep.
+
+        Returns:
+            (int, int): The number of triples kept and dropped.
+        """
+        relevant = set(iris)
+        todo = list(relevant)
+        while todo:
+            for parent in self.objects(todo.pop(), RDFS.subClassOf):
+                if parent not in relevant:
+                    relevant.add(parent)
+                    todo.append(parent)
+        for s in set(self.subjects()) - relevant:
+            self.remove((s, None, None))
+        return len(self), self.parsed - len(self)
+
+
+def referenced_iris(graphs: Iterable[Graph]) -> set:
+    """
+    Get all IRIs used as subject or object in the given graphs.
+
+    Args:
+        graphs (Iterable[Graph]): The SHACL graphs.
+    """
+    return {
+        term
+        for g in graphs
+        for s, _, o in g
+        for term in (s, o)
+        if isinstance(term, URIRef)
+    }
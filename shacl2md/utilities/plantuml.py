@@ -0,0 +1,185 @@
+import asyncio
+import os
+import subprocess
+from logging import Logger
+from typing import Dict, List, Optional
+
+from shacl2md.utilities.config import DIAGRAM_TIMEOUT, PLANTUML_JAR
+
+def _package_jar_path() -> str:
+    return os.path.join(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "plantuml.jar"
+    )
+
+
+def get_jar_path(plantuml_jar: Optional[str] = None) -> str:
+    """
+    Get the path of the PlantUML jar: the given jar, the jar in
+    $SHACL2MD_PLANTUML_JAR or the jar in the shacl2md installation folder.
+
+    Args:
+        plantuml_jar (str, optional): Path of an existing PlantUML jar. Defaults to None.
+    """
+    return plantuml_jar or PLANTUML_JAR or _package_jar_path()
+
+
+def resolve_jar(plantuml_jar: Optional[str] = None) -> str:
+    """
+    Get the path of an existing PlantUML jar, see get_jar_path. The jar is
+    never downloaded while rendering, it is downloaded ahead of time with
+    `shacl2md download-plantuml-jar`.
+
+    Args:
+        plantuml_jar (str, optional): Path of an existing PlantUML jar. Defaults to None.
+
+    Raises:
+        FileNotFoundError: Raised when the jar does not exist.
+    """
+    path = get_jar_path(plantuml_jar)
+    if not os.path.exists(path):
+        if path == _package_jar_path():
+            raise FileNotFoundError(
+                f"PlantUML jar '{path}' not found, download it with "
+                "`shacl2md download-plantuml-jar`, or set $SHACL2MD_PLANTUML_JAR"
+            )
+        raise FileNotFoundError(f"PlantUML jar '{path}' not found")
+    return path
+
+
+def svg_path(puml_path: str) -> str:
+    return f"{os.path.splitext(puml_path)[0]}.svg"
+
+
+def _prepare(puml_paths: List[str], timeout: int, jar_path: str) -> List[str]:
+    for puml_path in puml_paths:
+        # a stale SVG from an earlier run would hide a failure
+        if os.path.exists(svg_path(puml_path)):
+            os.remove(svg_path(puml_path))
+    return [
+        "java",
+        "-jar",
+        jar_path,
+        "-svg",
+        "-nbthread",
+        "auto",
+        "-timeout",
+        str(timeout),
+        *puml_paths,
+    ]
+
+
+def _collect_errors(
+    puml_paths: List[str], stderr: str, error: Optional[str], logger: Logger
+) -> Dict[str, Optional[str]]:
+    errors = {}
+    for puml_path in puml_paths:
+        if os.path.exists(svg_path(puml_path)):
+            errors[puml_path] = None
+            continue
+        # PlantUML reports failures per file on stderr
+        details = [line for line in stderr.splitlines() if puml_path in line]
+        errors[puml_path] = "; ".join(details) or error or "no SVG produced"
+        logger.error(
+            f"* File '{svg_path(puml_path)}' not created due to PlantUML error: {errors[puml_path]}",
+            extra={
+                "puml_file": puml_path,
+                "svg_file": svg_path(puml_path),
+                "error": errors[puml_path],
+            },
+        )
+    return errors
+
+
+def render_svgs(
+    puml_paths: List[str],
+    logger: Logger,
+    timeout: int = DIAGRAM_TIMEOUT,
+    plantuml_jar: Optional[str] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Render PlantUML files to SVG files next to them, with a single JVM.
+
+    Args:
+        puml_paths (List[str]): The PlantUML files to render.
+        logger (Logger): Logger for the files that could not be rendered.
+        timeout (int, optional): Seconds allowed per diagram. Defaults to DIAGRAM_TIMEOUT.
+        plantuml_jar (str, optional): Path of an existing PlantUML jar, see get_jar_path. Defaults to None.
+
+    Returns:
+        Dict[str, Optional[str]]: The error per PlantUML file, None if its SVG was rendered.
+    """
+    if not puml_paths:
+        return {}
+    stderr = ""
+    try:
+        command = _prepare(puml_paths, timeout, resolve_jar(plantuml_jar))
+        process = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=timeout * len(puml_paths),
+        )
+        stderr = process.stderr.decode(errors="replace")
+        error = f"exit status {process.returncode}" if process.returncode else None
+    except subprocess.TimeoutExpired:
+        error = f"timed out after {timeout * len(puml_paths)} seconds"
+    except Exception as e:
+        # no java, or no jar
+        error = str(e)
+    return _collect_errors(puml_paths, stderr, error, logger)
+
+
+async def arender_svgs(
+    puml_paths: List[str],
+    logger: Logger,
+    timeout: int = DIAGRAM_TIMEOUT,
+    plantuml_jar: Optional[str] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Render PlantUML files to SVG files next to them, with a single JVM,
+    without blocking the event loop. See render_svgs.
+    """
+    if not puml_paths:
+        return {}
+    stderr = ""
+    try:
+        command = _prepare(puml_paths, timeout, resolve_jar(plantuml_jar))
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr_bytes = await asyncio.wait_for(
+                process.communicate(), timeout * len(puml_paths)
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # no JVM is left running
+            process.kill()
+            await process.wait()
+            raise
+        stderr = stderr_bytes.decode(errors="replace")
+        error = f"exit status {process.returncode}" if process.returncode else None
+    except asyncio.TimeoutError:
+        error = f"timed out after {timeout * len(puml_paths)} seconds"
+    except Exception as e:
+        # no java, or no jar
+        error = str(e)
+    return _collect_errors(puml_paths, stderr, error, logger)
+
+
+def inline_svg(path: str) -> str:
+    """
+    Read a rendered SVG for inlining in a page, without its fixed size and style.
+
+    Args:
+        path (str): Path of the SVG file.
+    """
+    from lxml import etree
+
+    parser = etree.XMLParser(ns_clean=True, remove_comments=True)
+    tree = etree.parse(path, parser)
+    tree.getroot().attrib.pop("width")
+    tree.getroot().attrib.pop("height")
+    tree.getroot().attrib.pop("style")
+    return etree.tostring(tree.getroot(), encoding="unicode", xml_declaration=False)
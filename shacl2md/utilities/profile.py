@@ -0,0 +1,221 @@
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from shacl2md.utilities.cache import write_atomic
+
+
+class Span:
+    __slots__ = ("id", "parent", "name", "tags", "start", "duration")
+
+    def __init__(
+        self,
+        id: int,
+        parent: Optional[int],
+        name: str,
+        tags: dict,
+        start: float,
+        duration: float = 0.0,
+    ):
+        """
+        A timed phase of a build, e.g., parsing a file or rendering a page.
+
+        Args:
+            id (int): Number of the span in its profiler.
+            parent (int): Number of the span it is nested in, None at the top level.
+            name (str): Name of the phase.
+            tags (dict): What the phase worked on, e.g., the graph and the language.
+            start (float): Seconds since the profiler was created.
+            duration (float, optional): Seconds the phase took. Defaults to 0.0, until it ends.
+        """
+        self.id: int = id
+        self.parent: Optional[int] = parent
+        self.name: str = name
+        self.tags: dict = tags
+        self.start: float = start
+        self.duration: float = duration
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "tags": self.tags,
+            "start": self.start,
+            "duration": self.duration,
+        }
+
+
+# The open spans, innermost last, with their profiler. A context variable is
+# local to a thread and to an asyncio task, so concurrent coroutines each nest
+# their spans in the spans they opened themselves.
+_open_spans: ContextVar[Tuple[Tuple["Profiler", Span], ...]] = ContextVar(
+    "shacl2md_open_spans", default=()
+)
+
+
+class Profiler:
+    def __init__(self, record: bool = False):
+        """
+        Times the phases of a build as nested spans. The spans are kept when
+        recording, and passed to the hooks as they end, e.g., to feed metrics.
+        Without recording and hooks, spans are not timed at all.
+
+        Args:
+            record (bool, optional): Keep the spans, for the summary and the JSON profile. Defaults to False.
+        """
+        self.record: bool = record
+        self.spans: List[Span] = []
+        self.hooks: List[Callable[[Span], None]] = []
+        self.epoch: float = time.perf_counter()
+        self._next_id: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.record or bool(self.hooks)
+
+    def add_hook(self, hook: Callable[[Span], None]):
+        """
+        Call a function with every span that ends.
+
+        Args:
+            hook (Callable[[Span], None]): The function to call.
+        """
+        self.hooks.append(hook)
+
+    def _parent_id(self) -> Optional[int]:
+        # the innermost span of this profiler that is open in this context
+        for profiler, span in reversed(_open_spans.get()):
+            if profiler is self:
+                return span.id
+        return None
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _end(self, span: Span):
+        if self.record:
+            self.spans.append(span)
+        for hook in self.hooks:
+            hook(span)
+
+    @contextmanager
+    def span(self, name: str, **tags) -> Iterator[Optional[Span]]:
+        """
+        Time a phase, nested in the span that is open in this thread or asyncio task.
+
+        Args:
+            name (str): Name of the phase.
+            **tags: What the phase works on, e.g., graph="organization", lang="en".
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = Span(
+            self._new_id(),
+            self._parent_id(),
+            name,
+            tags,
+            time.perf_counter() - self.epoch,
+        )
+        token = _open_spans.set(_open_spans.get() + ((self, span),))
+        try:
+            yield span
+        finally:
+            # restores the spans that were open when this one started
+            _open_spans.reset(token)
+            span.duration = time.perf_counter() - self.epoch - span.start
+            self._end(span)
+
+    def fork(self) -> "Profiler":
+        """
+        A profiler for a worker process, recording its spans on the same clock
+        to be merged back into this one, see merge.
+        """
+        profiler = Profiler(record=self.enabled)
+        profiler.epoch = self.epoch
+        return profiler
+
+    def merge(self, spans: List[dict]):
+        """
+        Add the spans of a worker process, see fork. Its top-level spans are
+        nested in the span that is open in this thread or asyncio task.
+
+        Args:
+            spans (List[dict]): The spans of the worker, as dicts.
+        """
+        if not self.enabled:
+            return
+        ids = {None: self._parent_id()}
+        for span in spans:
+            ids[span["id"]] = self._new_id()
+        for span in spans:
+            self._end(
+                Span(
+                    ids[span["id"]],
+                    ids[span["parent"]],
+                    span["name"],
+                    span["tags"],
+                    span["start"],
+                    span["duration"],
+                )
+            )
+
+    def summary(self, top: Optional[int] = None) -> List[dict]:
+        """
+        The recorded spans per phase: their count, total, own and longest
+        duration. The own duration leaves out the spans nested in them.
+
+        Args:
+            top (int, optional): Only the phases with the longest own duration. Defaults to None, all phases.
+        """
+        nested: Dict[int, float] = {}
+        for span in self.spans:
+            if span.parent is not None:
+                nested[span.parent] = nested.get(span.parent, 0.0) + span.duration
+        phases: Dict[str, dict] = {}
+        for span in self.spans:
+            phase = phases.setdefault(
+                span.name,
+                {"name": span.name, "count": 0, "total": 0.0, "self": 0.0, "max": 0.0},
+            )
+            phase["count"] += 1
+            phase["total"] += span.duration
+            phase["self"] += max(span.duration - nested.get(span.id, 0.0), 0.0)
+            phase["max"] = max(phase["max"], span.duration)
+        return sorted(phases.values(), key=lambda p: p["self"], reverse=True)[:top]
+
+    def format_summary(self, top: int = 10) -> str:
+        """
+        The summary of the phases with the longest own duration as a table, see summary.
+
+        Args:
+            top (int, optional): Number of phases. Defaults to 10.
+        """
+        lines = [f"{'phase':<12} {'count':>6} {'total':>10} {'self':>10} {'max':>10}"]
+        for p in self.summary(top):
+            lines.append(
+                f"{p['name']:<12} {p['count']:>6} {p['total']:>9.3f}s {p['self']:>9.3f}s {p['max']:>9.3f}s"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: str):
+        """
+        Write the recorded spans and their summary as JSON.
+
+        Args:
+            path (str): Path of the JSON file.
+        """
+        write_atomic(
+            path,
+            json.dumps(
+                {
+                    "summary": self.summary(),
+                    "spans": [span.to_dict() for span in self.spans],
+                },
+                indent=2,
+            ).encode("utf-8"),
+        )
@@ -1,20 +1,25 @@
+import functools
+
+from rdflib.namespace import DCTERMS, OWL, RDF, RDFS, SKOS, Namespace
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.sparql import Query
+
+# The queries below are language-neutral: labels and descriptions are looked
+# up afterwards in a LabelTable, so every query runs once per graph instead of
+# once per language. The shapes themselves are read by the ShapeIndex.
+# Run them through prepared_query, which parses and translates each one once.
+
 GET_DOC_MD = """
 PREFIX owl: <http://www.w3.org/2002/07/owl#>
 PREFIX dct: <http://purl.org/dc/terms/>
 PREFIX pav: <http://purl.org/pav/>
-SELECT DISTINCT ?title ?created ?modified ?description ?version
+SELECT DISTINCT ?doc ?created ?modified ?version
 WHERE { 
     ?doc dct:title ?title; a owl:Ontology.
-    FILTER(lang(?title) = ?lang)
     OPTIONAL { ?doc dct:created ?created. }
     OPTIONAL { ?doc dct:modified ?modified. }
     OPTIONAL { ?doc pav:version ?version. }
-    OPTIONAL { 
-        ?doc dct:description ?description. 
-        FILTER(lang(?description) = ?lang)
-    }
 }
-LIMIT 1
 """
 
 
@@ -28,198 +33,33 @@ WHERE {
     OPTIONAL { ?a schema:email ?email. } 
 }
 """
-GET_CLASS = """
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-SELECT DISTINCT ?label ?description
-WHERE {
-    ?shape a sh:NodeShape ;
-        sh:targetClass ?iri .
-    OPTIONAL { 
-        ?iri rdfs:label ?label . 
-     FILTER(lang(?label) = ?lang)
-    }
-    OPTIONAL {?iri rdfs:comment ?rdfsdescription
-        FILTER(lang(?rdfsdescription) = ?lang) 
-    }
-    OPTIONAL {?iri skos:definition ?skosdefinition
-        FILTER(lang(?skosdefinition) = ?lang) 
-    }
-    BIND (
-        COALESCE(
-            IF(bound(?skosdefinition), ?skosdefinition, 1/0),
-            IF(bound(?rdfsdescription), ?rdfsdescription, 1/0)
-        ) AS ?description
-    )
-}
-"""
-
-GET_CLASSES = """
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX sh: <http://www.w3.org/ns/shacl#>
-PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-
-SELECT DISTINCT ?iri ?label ?description
-WHERE {
-    {?subjectclassNode sh:targetClass ?iri . }
-    UNION
-    {?property sh:or*/rdf:rest*/rdf:first*/sh:class ?iri .}
-
-    OPTIONAL { 
-        ?iri rdfs:label ?label. 
-     FILTER(lang(?label) = ?lang)
-    }
-    OPTIONAL {?iri rdfs:comment ?rdfsdescription
-        FILTER(lang(?rdfsdescription) = ?lang) 
-    }
-    OPTIONAL {?iri skos:definition ?skosdefinition
-        FILTER(lang(?skosdefinition) = ?lang) 
-    }
-    BIND (
-        COALESCE(
-            IF(bound(?skosdefinition), ?skosdefinition, 1/0),
-            IF(bound(?rdfsdescription), ?rdfsdescription, 1/0)
-        ) AS ?description
-    )
-}
-ORDER BY ?label
-"""
 
-GET_SUBCLASSES = """
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-SELECT DISTINCT ?iri ?label ?description
-WHERE { 
-    ?iri   rdfs:subClassOf ?parent ; 
-        a rdfs:Class.
-    OPTIONAL { 
-        ?iri rdfs:label ?label. 
-     FILTER(lang(?label) = ?lang)
-    }
-    OPTIONAL { 
-        ?iri rdfs:comment ?description. 
-        FILTER(lang(?description) = ?lang)
-    }
-
-}
-ORDER BY ?label
-"""
 
-GET_SUPERCLASSES = """
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-SELECT DISTINCT ?iri ?label ?description
-WHERE { 
-    ?child   rdfs:subClassOf ?iri . 
-    ?iri a rdfs:Class.
-    OPTIONAL { 
-        ?iri rdfs:label ?label. 
-        FILTER(lang(?label) = ?lang)
-    }
-    OPTIONAL { 
-        ?iri rdfs:comment ?description. 
-        FILTER(lang(?description) = ?lang)
-    }
+# The prefixes every query can use without declaring them
+NAMESPACES = {
+    "rdf": RDF,
+    "rdfs": RDFS,
+    "owl": OWL,
+    "skos": SKOS,
+    "dct": DCTERMS,
+    "sh": Namespace("http://www.w3.org/ns/shacl#"),
+    "pav": Namespace("http://purl.org/pav/"),
+    "schema": Namespace("https://schema.org/"),
 }
-ORDER BY ?label
-"""
-
-GET_PROPERTIES = """
-PREFIX sh: <http://www.w3.org/ns/shacl#>
-PREFIX schema: <http://schema.org/>
-SELECT DISTINCT ?shape ?iri ?label ?description ?min ?max ?kind ?uniqueLang
-WHERE {
-    ?subjectclassNode sh:targetClass ?targetClass .
-    ?subjectclassNode sh:or*/rdf:rest*/rdf:first*/sh:property ?shape .
-    ?shape sh:path ?iri.
 
-    # Label
-    OPTIONAL {
-        ?shape sh:name ?shname
-        FILTER(lang(?shname) = ?lang) 
-    }
-    OPTIONAL {
-        ?iri rdfs:label ?rdfslabel
-        FILTER(lang(?rdfslabel) = ?lang) 
-    }
-    BIND (
-        COALESCE(
-            IF(bound(?shname), ?shname, 1/0),
-            IF(bound(?rdfslabel), ?rdfslabel, 1/0)
-        ) AS ?label
-    )
-
-    # Description  
-    OPTIONAL {?shape sh:description ?shacldescription
-        FILTER(lang(?shacldescription) = ?lang) 
-    }
-    OPTIONAL {?iri rdfs:comment ?rdfsdescription
-        FILTER(lang(?rdfsdescription) = ?lang) 
-    }
-    OPTIONAL {?iri skos:definition ?skosdefinition
-        FILTER(lang(?skosdefinition) = ?lang) 
-    }
-    BIND (
-        COALESCE(
-            IF(bound(?shacldescription), ?shacldescription, 1/0),
-            IF(bound(?skosdefinition), ?skosdefinition, 1/0),
-            IF(bound(?rdfsdescription), ?rdfsdescription, 1/0)
-        ) AS ?description
-    )
-
-    # Cardinality
-    OPTIONAL {?shape sh:minCount ?min}
-    OPTIONAL {?shape sh:maxCount ?max}
-    OPTIONAL {?shape sh:uniqueLang ?uniqueLang}
-
-    OPTIONAL {
-        ?shape sh:nodeKind ?kind
-    }
+QUERIES = {
+    "GET_DOC_MD": GET_DOC_MD,
+    "GET_AUTHORS": GET_AUTHORS,
 }
-ORDER BY ?label
-"""
 
-GET_DATATYPES = """
-PREFIX sh: <http://www.w3.org/ns/shacl#>
-SELECT DISTINCT ?iri ?label ?type ?kind
-WHERE {
-    {
-        ?shape sh:or*/rdf:rest*/rdf:first*/sh:datatype ?iri .
-        OPTIONAL {
-            ?iri rdfs:label ?label
-            FILTER(lang(?label) = ?lang)
-        }
-        BIND("datatype" AS ?type)
-    } UNION {
-        ?shape sh:or*/rdf:rest*/rdf:first*/sh:class ?iri .
-        OPTIONAL {
-            ?iri rdfs:label ?label
-            FILTER(lang(?label) = ?lang)
-        }
-        BIND("class" AS ?type)
-    }
-}
-"""
 
-GET_VALUES = """
-PREFIX sh: <http://www.w3.org/ns/shacl#>
-PREFIX schema: <http://schema.org/>
-SELECT ?iri ?label
-WHERE {
-    ?shape sh:in ?n .
-    OPTIONAL{
-        ?n rdf:rest*/rdf:first ?iri
-        
-        OPTIONAL {
-            ?iri rdfs:label ?label
-            FILTER(lang(?label) = ?lang)
-        }    
-    } 
-}
-"""
+@functools.lru_cache(maxsize=None)
+def prepared_query(name: str) -> Query:
+    """
+    Get a query of QUERIES, parsed and translated to SPARQL algebra once per
+    process instead of at every call of `Graph.query`.
 
-CLASS_EXISTS_CHECK = """
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-PREFIX sh: <http://www.w3.org/ns/shacl#> 
-ASK {
-    ?shape a sh:NodeShape ;
-        sh:targetClass ?iri .
-}
-"""
+    Args:
+        name (str): Name of the query, e.g., "GET_DOC_MD".
+    """
+    return prepareQuery(QUERIES[name], initNs=NAMESPACES)
@@ -0,0 +1,113 @@
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class QueryStats:
+    def __init__(self, slowest: int = 10):
+        """
+        Statistics of the lookups that extract the models from the graphs:
+        the SPARQL queries, and the shape and label lookups that replaced the
+        queries per shape. Per lookup it counts the calls, their time and the
+        rows they returned, and it keeps the slowest calls with their bindings,
+        e.g., the shape that took longest.
+
+        Args:
+            slowest (int, optional): Number of slowest calls to keep. Defaults to 10.
+        """
+        self.slowest_count: int = slowest
+        self.queries: Dict[str, dict] = {}
+        self._slowest: list = []
+        # breaks ties in the heap of slowest calls, their bindings do not compare
+        self._counter = itertools.count()
+
+    def record(
+        self, name: str, seconds: float, rows: int, bindings: Optional[dict] = None
+    ):
+        """
+        Record a call of a lookup.
+
+        Args:
+            name (str): Name of the lookup, e.g., "GET_DOC_MD" or "node_shape".
+            seconds (float): Time the call took.
+            rows (int): Number of rows it returned.
+            bindings (dict, optional): What the call looked up, e.g., {"shape": ...}. Defaults to None.
+        """
+        query = self.queries.setdefault(
+            name, {"name": name, "calls": 0, "total": 0.0, "max": 0.0, "rows": 0}
+        )
+        query["calls"] += 1
+        query["total"] += seconds
+        query["max"] = max(query["max"], seconds)
+        query["rows"] += rows
+        call = (seconds, next(self._counter), name, rows, bindings)
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, call)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, call)
+
+    def summary(self) -> List[dict]:
+        """
+        The statistics per lookup, the longest total time first.
+        """
+        return sorted(
+            (
+                dict(query, mean=query["total"] / query["calls"])
+                for query in self.queries.values()
+            ),
+            key=lambda query: query["total"],
+            reverse=True,
+        )
+
+    def slowest(self) -> List[dict]:
+        """
+        The slowest calls, the slowest first.
+        """
+        return [
+            {
+                "name": name,
+                "seconds": seconds,
+                "rows": rows,
+                "bindings": {k: str(v) for k, v in (bindings or {}).items()},
+            }
+            for seconds, _, name, rows, bindings in sorted(self._slowest, reverse=True)
+        ]
+
+    def format_summary(self) -> str:
+        """
+        The statistics per lookup and the slowest calls as tables.
+        """
+        lines = [
+            f"{'query':<16} {'calls':>7} {'total':>10} {'mean':>10} {'max':>10} {'rows':>8}"
+        ]
+        for q in self.summary():
+            lines.append(
+                f"{q['name']:<16} {q['calls']:>7} {q['total']:>9.3f}s {q['mean'] * 1000:>8.3f}ms {q['max'] * 1000:>8.3f}ms {q['rows']:>8}"
+            )
+        lines.append("")
+        lines.append(f"{'slowest calls':<16} {'time':>10} {'rows':>8}  bindings")
+        for call in self.slowest():
+            bindings = ", ".join(f"{k}={v}" for k, v in call["bindings"].items())
+            lines.append(
+                f"{call['name']:<16} {call['seconds'] * 1000:>8.3f}ms {call['rows']:>8}  {bindings or '-'}"
+            )
+        return "\n".join(lines)
+
+
+def timed(stats: Optional[QueryStats], name: str, run: Callable[[], list], **bindings) -> list:
+    """
+    Run a lookup, and record it when collecting statistics, see QueryStats.record.
+
+    Args:
+        stats (QueryStats): The statistics, None when they are not collected.
+        name (str): Name of the lookup.
+        run (Callable[[], list]): The lookup, returning its rows.
+        **bindings: What the call looks up, e.g., shape=...
+    """
+    if stats is None:
+        return run()
+    start = time.perf_counter()
+    rows = run()
+    stats.record(name, time.perf_counter() - start, len(rows), bindings)
+    return rows
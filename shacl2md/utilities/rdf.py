@@ -1,19 +1,12 @@
-import json
-from typing import List
+from typing import Callable, Iterable, List, Optional
 
-from rdflib.graph import Graph
-from rdflib.namespace import Namespace
+from rdflib.graph import Graph, ReadOnlyGraphAggregate
+from rdflib.namespace import DCTERMS, RDFS, SKOS, Namespace
 from rdflib.term import Literal
 
-from shacl2md.utilities.queries import (
-    CLASS_EXISTS_CHECK,
-    GET_CLASS,
-    GET_DATATYPES,
-    GET_PROPERTIES,
-    GET_SUBCLASSES,
-    GET_SUPERCLASSES,
-    GET_VALUES,
-)
+from shacl2md.utilities.queries import prepared_query
+from shacl2md.utilities.query_stats import QueryStats, timed
+from shacl2md.utilities.shapes import ShapeIndex
 
 SHACL = Namespace("http://www.w3.org/ns/shacl#")
 
@@ -22,7 +15,284 @@ def to_shortname(g: Graph, term):
     return term.n3(g.namespace_manager) if term is not None else ""
 
 
+def order_by_label(items, label):
+    """
+    Sort items the way SPARQL `ORDER BY ?label` does: unbound labels first.
+
+    Args:
+        items: Items to sort.
+        label: Function returning the label of an item, or None.
+    """
+
+    def key(item):
+        item_label = label(item)
+        return (item_label is not None, str(item_label) if item_label else "")
+
+    return sorted(items, key=key)
+
+
+class LabelTable:
+    """
+    Multilingual table of the labels and descriptions in a graph.
+
+    All language-tagged literals of the label and description predicates are
+    gathered in a single pass, so the text for every language can be looked
+    up afterwards without querying the graph again.
+    """
+
+    predicates = (
+        RDFS.label,
+        RDFS.comment,
+        SKOS.definition,
+        SHACL.name,
+        SHACL.description,
+        DCTERMS.title,
+        DCTERMS.description,
+    )
+
+    def __init__(self, g: Graph, stats: Optional[QueryStats] = None):
+        self.literals: dict = {}
+        for predicate in self.predicates:
+            triples = g.triples((None, predicate, None))
+            if stats is not None:
+                triples = timed(stats, "label_triples", lambda: list(triples), predicate=predicate)
+            for s, _, o in triples:
+                if isinstance(o, Literal) and o.language:
+                    self.literals.setdefault((s, predicate), {}).setdefault(
+                        o.language, o
+                    )
+
+    def get(self, lang: str, *keys):
+        """
+        Get the first literal in a language, in order of preference.
+
+        Args:
+            lang (str): The language of the literal.
+            *keys: (subject, predicate) tuples to look up, in order of preference.
+        """
+        for key in keys:
+            literal = self.literals.get(key, {}).get(lang)
+            if literal is not None:
+                return literal
+        return None
+
+
+class ShaclModel:
+    def __init__(
+        self,
+        name: str,
+        g: Graph,
+        ontology_graph: Graph = None,
+        stats: Optional[QueryStats] = None,
+    ):
+        """
+        A language-neutral extraction of a SHACL graph.
+
+        The structure of the model is indexed once and shared by the
+        documentation of every language, which only picks its labels from the
+        label table. The shapes and the ontology are read through a read-only
+        union view, neither graph is modified.
+
+        Args:
+            name (str): The name of the SHACL graph.
+            g (Graph): The SHACL graph.
+            ontology_graph (Graph, optional): The ontology graph. Defaults to None.
+            stats (QueryStats, optional): Statistics of the queries and lookups of the extraction. Defaults to None, no statistics are collected.
+        """
+        self.name = name
+        self.graph = g
+        self.view: Graph = (
+            ReadOnlyGraphAggregate([g, ontology_graph])
+            if ontology_graph is not None
+            else g
+        )
+        self.view.namespace_manager = g.namespace_manager
+        self.labels = LabelTable(self.view, stats)
+        self.shapes = ShapeIndex(self.view, stats)
+        self.docs = self._query("GET_DOC_MD", stats)
+        self.authors = self._query("GET_AUTHORS", stats)
+        self.classes = self.shapes.classes
+
+    def _query(self, name: str, stats: Optional[QueryStats]) -> list:
+        return timed(
+            stats,
+            name,
+            lambda: list(self.view.query(prepared_query(name))),
+            graph=self.name,
+        )
+
+    def class_exists(self, iri) -> bool:
+        return iri in self.shapes.defined_classes
+
+    def properties(self, target_class) -> list:
+        return self.shapes.properties.get(target_class, [])
+
+    def subclasses(self, parent) -> list:
+        return self.shapes.subclasses.get(parent, [])
+
+    def superclasses(self, child) -> list:
+        return self.shapes.superclasses.get(child, [])
+
+    def get_doc(self, lang: str):
+        """
+        Get the document metadata in a language.
+
+        Args:
+            lang (str): The language of the title and description.
+        """
+        for row in self.docs:
+            title = self.labels.get(lang, (row.doc, DCTERMS.title))
+            if title is not None:
+                return RDFDoc(
+                    title,
+                    row.created,
+                    row.modified,
+                    row.version,
+                    self.labels.get(lang, (row.doc, DCTERMS.description)),
+                    self.authors,
+                )
+
+    def class_label(self, iri, lang: str):
+        return self.labels.get(lang, (iri, RDFS.label))
+
+    def class_description(self, iri, lang: str):
+        return self.labels.get(lang, (iri, SKOS.definition), (iri, RDFS.comment))
+
+
+class ClassIndex:
+    def __init__(self, models: Iterable[ShaclModel], languages: List[str]):
+        """
+        An index of the classes defined by every graph, for crosslinking.
+
+        It maps the target class of every node shape to the graphs defining
+        it, with its label and description in every language, so looking up
+        where a class is documented needs no pass over the other graphs.
+
+        Args:
+            models (Iterable[ShaclModel]): The models of all graphs.
+            languages (List[str]): The languages of the documentation.
+        """
+        self.graphs: dict = {}
+        self.info: dict = {}
+        for model in models:
+            for iri in model.shapes.defined_classes:
+                self.graphs.setdefault(iri, []).append(
+                    (model.name, model.graph.identifier)
+                )
+                for lang in languages:
+                    self.info[(iri, model.name, lang)] = (
+                        model.class_label(iri, lang),
+                        model.class_description(iri, lang),
+                    )
+
+    def defined_in(self, iri, exclude: Optional[str] = None) -> list:
+        """
+        Get the graphs that define a class, in the order the graphs were added.
+
+        Args:
+            iri: The IRI of the class.
+            exclude (str, optional): Name of a graph to leave out. Defaults to None.
+
+        Returns:
+            list: The (name, identifier) of every graph.
+        """
+        return [graph for graph in self.graphs.get(iri, ()) if graph[0] != exclude]
+
+    def class_info(self, iri, graph_name: str, lang: str) -> tuple:
+        """
+        Get the label and description of a class in the graph defining it.
+
+        Returns:
+            tuple: The label and the description, either can be None.
+        """
+        return self.info.get((iri, graph_name, lang), (None, None))
+
+
+def plain(value):
+    """
+    Get a value as the templates use it, RDF terms as plain strings.
+    """
+    return str.__str__(value) if isinstance(value, str) else value
+
+
+class ClassRegistry:
+    def __init__(self):
+        """
+        The materialized classes of the pages being built, shared by every class referencing them.
+
+        A class is keyed by (graph name, class IRI, language) and built once,
+        with its properties, datatypes and values, however many classes
+        reference it, e.g., as their superclass. Only the page of its graph
+        and language references it, the classes of a page are forgotten once
+        its classes are built, see forget.
+        """
+        self.classes: dict = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: tuple, build: Callable[[], "RDFClass"]) -> "RDFClass":
+        """
+        Get a class, building it the first time it is referenced.
+
+        Args:
+            key (tuple): The (graph name, class IRI, language) of the class.
+            build (Callable[[], RDFClass]): Builds the class.
+        """
+        if key in self.classes:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.classes[key] = build()
+        return self.classes[key]
+
+    def forget(self, graph_name: str, lang: Optional[str] = None):
+        """
+        Remove the classes of a graph, e.g., when the graph changed, or of the
+        page of a graph in a language.
+
+        Args:
+            graph_name (str): Name of the graph.
+            lang (str, optional): Language of the page. Defaults to None, all languages.
+        """
+        self.classes = {
+            k: c
+            for k, c in self.classes.items()
+            if k[0] != graph_name or (lang is not None and k[2] != lang)
+        }
+
+
+class RDFDoc:
+    def __init__(
+        self,
+        title,
+        created,
+        modified,
+        version,
+        description,
+        authors,
+    ):
+        self.title = title
+        self.created = created
+        self.modified = modified
+        self.version = version
+        self.description = description
+        self.authors = authors
+
+
 class RDFClass:
+    __slots__ = (
+        "lang",
+        "iri",
+        "shortname",
+        "label",
+        "description",
+        "properties",
+        "subclasses",
+        "superclasses",
+        "type",
+        "crosslink",
+    )
+
     def __init__(
         self,
         lang: str,
@@ -44,94 +314,109 @@ class RDFClass:
 
     def get_superclasses(
         self,
-        g: Graph,
+        model: ShaclModel,
+        registry: ClassRegistry = None,
     ):
+        def get_superclass(parent):
+            super_class = RDFClass(
+                self.lang,
+                parent,
+                to_shortname(model.graph, parent),
+                model.class_label(parent, self.lang),
+                model.labels.get(self.lang, (parent, RDFS.comment)),
+            )
+            super_class.get_properties(model)
+            return super_class
+
         def get_superclasses_generator():
-            for parent in g.query(
-                GET_SUPERCLASSES,
-                initBindings={"lang": Literal(self.lang), "child": self.iri},
+            for parent in order_by_label(
+                model.superclasses(self.iri),
+                lambda iri: model.class_label(iri, self.lang),
             ):
-                super_class = RDFClass(
-                    self.lang,
-                    parent.iri,
-                    to_shortname(g, parent.iri),
-                    parent.label,
-                    parent.description,
-                )
-                super_class.get_properties(g)
-                yield super_class
+                if registry is None:
+                    yield get_superclass(parent)
+                else:
+                    yield registry.get(
+                        (model.name, parent, self.lang),
+                        lambda: get_superclass(parent),
+                    )
 
         self.superclasses = list(get_superclasses_generator())
 
     def get_subclasses(
         self,
-        g: Graph,
+        model: ShaclModel,
     ):
         def get_subclasses_generator():
-            for child in g.query(
-                GET_SUBCLASSES,
-                initBindings={"lang": Literal(self.lang), "parent": self.iri},
+            for child in order_by_label(
+                model.subclasses(self.iri),
+                lambda iri: model.class_label(iri, self.lang),
             ):
                 sub_class = RDFClass(
                     self.lang,
-                    child.iri,
-                    to_shortname(g, child.iri),
-                    child.label,
-                    child.description,
+                    child,
+                    to_shortname(model.graph, child),
+                    model.class_label(child, self.lang),
+                    model.labels.get(self.lang, (child, RDFS.comment)),
                 )
                 yield sub_class
 
         self.subclasses = list(get_subclasses_generator())
 
-    def get_properties(self, g: Graph, g_crosslinks: List[Graph] = []):
+    def get_properties(self, model: ShaclModel, class_index: ClassIndex = None):
+        def property_label(prop):
+            return model.labels.get(
+                self.lang, (prop.shape, SHACL.name), (prop.iri, RDFS.label)
+            )
+
         def get_properties_generator():
-            for prop in g.query(
-                GET_PROPERTIES,
-                initBindings={"lang": Literal(self.lang), "targetClass": self.iri},
-            ):
+            for prop in order_by_label(model.properties(self.iri), property_label):
                 property = RDFProperty(
                     prop.iri,
-                    to_shortname(g, prop.iri),
-                    prop.label,
-                    prop.description,
+                    to_shortname(model.graph, prop.iri),
+                    property_label(prop),
+                    model.labels.get(
+                        self.lang,
+                        (prop.shape, SHACL.description),
+                        (prop.iri, SKOS.definition),
+                        (prop.iri, RDFS.comment),
+                    ),
                     prop.min,
                     prop.max,
                     prop.uniqueLang,
                 )
-                property.get_datatypes(g, prop.shape, self.lang, g_crosslinks)
+                property.get_datatypes(model, prop.datatypes, self.lang, class_index)
                 if not property.datatypes and prop.kind == SHACL.IRI:
                     property.datatypes = [
                         RDFDatatype(
                             "https://www.rfc-editor.org/rfc/rfc3987.txt", "IRI", "IRI"
                         )
                     ]
-                property.get_values(g, prop.shape, self.lang)
+                property.get_values(model, prop.values, self.lang)
                 yield property
 
         self.properties = list(get_properties_generator())
 
     def get_class_info(
         self,
-        g: Graph,
+        model: ShaclModel,
     ):
-        for row in g.query(
-            GET_CLASS, initBindings={"lang": Literal(self.lang), "iri": self.iri}
-        ):
-            self.label = row.label
-            self.description = row.description
-
-    def check_crosslink(self, g: Graph, g_crosslinks: List[Graph] = []):
-        class_exists = g.query(
-            CLASS_EXISTS_CHECK, initBindings={"iri": self.iri}
-        ).askAnswer
-        if g_crosslinks and (not class_exists or not self.label):
-            for graph in g_crosslinks:
-                if graph.query(
-                    CLASS_EXISTS_CHECK, initBindings={"iri": self.iri}
-                ).askAnswer:
-                    if not class_exists:
-                        self.crosslink = graph.identifier
-                    self.get_class_info(graph)
+        label = model.class_label(self.iri, self.lang)
+        if label is not None:
+            self.label = label
+        self.description = model.class_description(self.iri, self.lang)
+
+    def check_crosslink(self, model: ShaclModel, class_index: ClassIndex = None):
+        class_exists = model.class_exists(self.iri)
+        if class_index is not None and (not class_exists or not self.label):
+            for name, identifier in class_index.defined_in(self.iri, model.name):
+                if not class_exists:
+                    self.crosslink = identifier
+                label, self.description = class_index.class_info(
+                    self.iri, name, self.lang
+                )
+                if label is not None:
+                    self.label = label
 
     # # deep copy method
     # def copy(self):
@@ -144,10 +429,33 @@ class RDFClass:
     #     return copy_class
 
     def to_dict(self) -> dict:
-        return json.loads(json.dumps(self, default=lambda o: o.__dict__))
+        return {
+            "lang": self.lang,
+            "iri": plain(self.iri),
+            "shortname": self.shortname,
+            "label": plain(self.label),
+            "description": plain(self.description),
+            "properties": [prop.to_dict() for prop in self.properties],
+            "subclasses": [sub.to_dict() for sub in self.subclasses],
+            "superclasses": [sup.to_dict() for sup in self.superclasses],
+            "type": self.type,
+            "crosslink": plain(self.crosslink),
+        }
 
 
 class RDFProperty:
+    __slots__ = (
+        "iri",
+        "shortname",
+        "label",
+        "description",
+        "min",
+        "max",
+        "uniqueLang",
+        "datatypes",
+        "value_list",
+    )
+
     def __init__(
         self,
         iri,
@@ -168,33 +476,40 @@ class RDFProperty:
         self.datatypes = []
         self.value_list = []
 
-    def get_datatypes(self, g: Graph, s, lang: str, g_crosslinks: List[Graph] = []):
+    def get_datatypes(
+        self,
+        model: ShaclModel,
+        datatypes: list,
+        lang: str,
+        class_index: ClassIndex = None,
+    ):
         def get_datatypes_generator():
-            for dt in g.query(
-                GET_DATATYPES, initBindings={"lang": Literal(lang), "shape": s}
-            ):
-                if dt.type.toPython() == "datatype":
+            for iri, type in datatypes:
+                if type == "datatype":
                     yield RDFDatatype(
-                        dt.iri,
-                        to_shortname(g, dt.iri),
-                        dt.label,
+                        iri,
+                        to_shortname(model.graph, iri),
+                        model.class_label(iri, lang),
+                    )
+                elif type == "class":
+                    dt_class = RDFClass(
+                        lang,
+                        iri,
+                        to_shortname(model.graph, iri),
+                        model.class_label(iri, lang),
                     )
-                elif dt.type.toPython() == "class":
-                    dt_class = RDFClass(lang, dt.iri, to_shortname(g, dt.iri), dt.label)
-                    dt_class.check_crosslink(g, g_crosslinks)
+                    dt_class.check_crosslink(model, class_index)
                     yield dt_class
 
         self.datatypes = list(get_datatypes_generator())
 
-    def get_values(self, g: Graph, s, lang: str):
+    def get_values(self, model: ShaclModel, values: list, lang: str):
         def get_values_generator():
-            for value in g.query(
-                GET_VALUES, initBindings={"lang": Literal(lang), "shape": s}
-            ):
+            for value in values:
                 yield RDFValue(
-                    value.iri,
-                    to_shortname(g, value.iri),
-                    value.label,
+                    value,
+                    to_shortname(model.graph, value),
+                    model.class_label(value, lang),
                 )
 
         self.value_list = list(get_values_generator())
@@ -211,11 +526,23 @@ class RDFProperty:
     #     copy_prop.datatypes = [dt.copy() for dt in self.datatypes]
     #     copy_prop.value_list = [value.copy() for value in self.value_list]
 
-    def to_dict(self):
-        return json.loads(json.dumps(self, default=lambda o: o.__dict__))
+    def to_dict(self) -> dict:
+        return {
+            "iri": plain(self.iri),
+            "shortname": self.shortname,
+            "label": plain(self.label),
+            "description": plain(self.description),
+            "min": plain(self.min),
+            "max": plain(self.max),
+            "uniqueLang": plain(self.uniqueLang),
+            "datatypes": [dt.to_dict() for dt in self.datatypes],
+            "value_list": [value.to_dict() for value in self.value_list],
+        }
 
 
 class RDFDatatype:
+    __slots__ = ("iri", "shortname", "label", "type")
+
     def __init__(
         self,
         iri,
@@ -231,11 +558,18 @@ class RDFDatatype:
         copy_dt = RDFDatatype(self.iri, self.shortname, self.label)
         return copy_dt
 
-    def to_dict(self):
-        return json.loads(json.dumps(self, default=lambda o: o.__dict__))
+    def to_dict(self) -> dict:
+        return {
+            "iri": plain(self.iri),
+            "shortname": self.shortname,
+            "label": plain(self.label),
+            "type": self.type,
+        }
 
 
 class RDFValue:
+    __slots__ = ("iri", "shortname", "label")
+
     def __init__(
         self,
         iri,
@@ -250,5 +584,9 @@ class RDFValue:
     #     copy_value = RDFValue(self.iri, self.shortname, self.label)
     #     return copy_value
 
-    def to_dict(self):
-        return json.loads(json.dumps(self, default=lambda o: o.__dict__))
+    def to_dict(self) -> dict:
+        return {
+            "iri": plain(self.iri),
+            "shortname": self.shortname,
+            "label": plain(self.label),
+        }
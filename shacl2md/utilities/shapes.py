@@ -0,0 +1,208 @@
+from itertools import product
+from typing import List, Optional
+
+from rdflib.graph import Graph
+from rdflib.namespace import RDF, RDFS, Namespace
+
+from shacl2md.utilities.query_stats import QueryStats, timed
+
+SHACL = Namespace("http://www.w3.org/ns/shacl#")
+
+
+def _unique(items) -> list:
+    return list(dict.fromkeys(items))
+
+
+class PropertyShape:
+    def __init__(
+        self,
+        shape,
+        iri,
+        min,
+        max,
+        kind,
+        uniqueLang,
+    ):
+        self.shape = shape
+        self.iri = iri
+        self.min = min
+        self.max = max
+        self.kind = kind
+        self.uniqueLang = uniqueLang
+        self.datatypes = []
+        self.values = []
+
+
+class ShapeIndex:
+    """
+    An index of the shapes in a SHACL graph.
+
+    The index is built with one `triples()` lookup per SHACL predicate, so
+    every triple is read once. It maps each target class to its property
+    shapes, with their path, cardinality, node kind, datatypes, classes and
+    values, so no queries are needed per class or per property.
+    """
+
+    predicates = (
+        SHACL.targetClass,
+        SHACL.property,
+        SHACL["or"],
+        SHACL.path,
+        SHACL.minCount,
+        SHACL.maxCount,
+        SHACL.uniqueLang,
+        SHACL.nodeKind,
+        SHACL.datatype,
+        SHACL["class"],
+        SHACL["in"],
+        RDF.first,
+        RDF.rest,
+        RDFS.subClassOf,
+    )
+
+    def __init__(self, g: Graph, stats: Optional[QueryStats] = None):
+        self._stats: Optional[QueryStats] = stats
+        # objects are kept as ordered sets, a union of graphs may repeat triples
+        self._objects: dict = {p: {} for p in self.predicates}
+        for predicate, objects in self._objects.items():
+            triples = g.triples((None, predicate, None))
+            if stats is not None:
+                triples = timed(stats, "shape_triples", lambda: list(triples), predicate=predicate)
+            for s, _, o in triples:
+                objects.setdefault(s, {})[o] = None
+        node_shapes = set(g.subjects(RDF.type, SHACL.NodeShape))
+        rdfs_classes = set(g.subjects(RDF.type, RDFS.Class))
+
+        target_classes = self._objects[SHACL.targetClass]
+        self.classes: list = _unique(
+            [c for cs in target_classes.values() for c in cs]
+            + [c for cs in self._objects[SHACL["class"]].values() for c in cs]
+        )
+        self.defined_classes: set = {
+            c for s, cs in target_classes.items() if s in node_shapes for c in cs
+        }
+
+        self.properties: dict = {}
+        shapes: dict = {}
+        for node, classes in target_classes.items():
+            property_shapes = timed(
+                stats, "node_shape", lambda: self._property_shapes(node, shapes), shape=node
+            )
+            for property_shape in property_shapes:
+                for c in classes:
+                    self.properties.setdefault(c, {})[
+                        self._key(property_shape)
+                    ] = property_shape
+        self.properties = {c: list(p.values()) for c, p in self.properties.items()}
+
+        self.subclasses: dict = {}
+        self.superclasses: dict = {}
+        for child, parents in self._objects[RDFS.subClassOf].items():
+            for parent in parents:
+                if child in rdfs_classes:
+                    self.subclasses.setdefault(parent, []).append(child)
+                if parent in rdfs_classes:
+                    self.superclasses.setdefault(child, []).append(parent)
+
+    def objects(self, s, predicate) -> list:
+        return list(self._objects[predicate].get(s, ()))
+
+    def closure(self, s, predicate) -> list:
+        """
+        Nodes reachable from s over zero or more predicate edges (`predicate*`),
+        in depth-first order.
+        """
+        nodes = [s]
+        seen = {s}
+        stack = [iter(self.objects(s, predicate))]
+        while stack:
+            o = next(stack[-1], None)
+            if o is None:
+                stack.pop()
+            elif o not in seen:
+                seen.add(o)
+                nodes.append(o)
+                stack.append(iter(self.objects(o, predicate)))
+        return nodes
+
+    def reachable(self, s) -> list:
+        """
+        Nodes reachable from s over `sh:or*/rdf:rest*/rdf:first*`, i.e. the
+        node itself and the members of its (nested) `sh:or` lists.
+        """
+        return _unique(
+            member
+            for alternative in self.closure(s, SHACL["or"])
+            for cell in self.closure(alternative, RDF.rest)
+            for member in self.closure(cell, RDF.first)
+        )
+
+    def datatypes(self, shape) -> list:
+        """
+        The `(iri, type)` datatypes of a property shape, where type is
+        `"datatype"` for `sh:datatype` and `"class"` for `sh:class`.
+        """
+        nodes = self.reachable(shape)
+        return _unique(
+            [(o, "datatype") for n in nodes for o in self.objects(n, SHACL.datatype)]
+            + [(o, "class") for n in nodes for o in self.objects(n, SHACL["class"])]
+        )
+
+    def values(self, shape) -> list:
+        """
+        The members of the `sh:in` lists of a property shape. An empty list,
+        `rdf:nil`, has no members.
+        """
+        return [
+            member
+            for n in self.objects(shape, SHACL["in"])
+            for cell in self.closure(n, RDF.rest)
+            for member in self.objects(cell, RDF.first)
+        ]
+
+    def _property_shapes(self, node, shapes: dict) -> List[PropertyShape]:
+        property_shapes = []
+        for n in self.reachable(node):
+            for shape in self.objects(n, SHACL.property):
+                if shape not in shapes:
+                    if self._stats is None:
+                        shapes[shape] = self._property_shape(shape)
+                    else:
+                        # the bindings are only built when collecting statistics
+                        shapes[shape] = timed(
+                            self._stats,
+                            "property_shape",
+                            lambda: self._property_shape(shape),
+                            shape=shape,
+                            path=", ".join(self.objects(shape, SHACL.path)),
+                        )
+                property_shapes.extend(shapes[shape])
+        return property_shapes
+
+    def _property_shape(self, shape) -> List[PropertyShape]:
+        datatypes = self.datatypes(shape)
+        values = self.values(shape)
+        property_shapes = []
+        for iri, min, max, kind, unique_lang in product(
+            self.objects(shape, SHACL.path),
+            self.objects(shape, SHACL.minCount) or [None],
+            self.objects(shape, SHACL.maxCount) or [None],
+            self.objects(shape, SHACL.nodeKind) or [None],
+            self.objects(shape, SHACL.uniqueLang) or [None],
+        ):
+            property_shape = PropertyShape(shape, iri, min, max, kind, unique_lang)
+            property_shape.datatypes = datatypes
+            property_shape.values = values
+            property_shapes.append(property_shape)
+        return property_shapes
+
+    @staticmethod
+    def _key(property_shape: PropertyShape) -> tuple:
+        return (
+            property_shape.shape,
+            property_shape.iri,
+            property_shape.min,
+            property_shape.max,
+            property_shape.kind,
+            property_shape.uniqueLang,
+        )
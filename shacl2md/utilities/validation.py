@@ -0,0 +1,62 @@
+from rdflib.graph import Graph
+
+# The SHACL shapes that validate SHACL graphs, built into pyshacl
+SHACL_SHACL = "http://www.w3.org/ns/shacl-shacl"
+
+
+class ValidationReport:
+    def __init__(
+        self,
+        graph_name: str,
+        conforms: bool,
+        results_graph: Graph,
+        results_text: str,
+    ):
+        """
+        The result of validating a SHACL graph against the SHACL specification.
+
+        Args:
+            graph_name (str): Name of the validated graph.
+            conforms (bool): Whether the graph conforms.
+            results_graph (Graph): The SHACL validation report graph.
+            results_text (str): The report as text, as printed by pyshacl.
+        """
+        self.graph_name: str = graph_name
+        self.conforms: bool = conforms
+        self.results_graph: Graph = results_graph
+        self.results_text: str = results_text
+
+    def to_dict(self) -> dict:
+        return {
+            "graph": self.graph_name,
+            "conforms": self.conforms,
+            "results": self.results_graph.serialize(format="turtle"),
+            "text": self.results_text,
+        }
+
+    @classmethod
+    def from_dict(cls, report: dict) -> "ValidationReport":
+        results_graph = Graph()
+        results_graph.parse(data=report["results"], format="turtle")
+        return cls(report["graph"], report["conforms"], results_graph, report["text"])
+
+
+def validate_shapes(graph_name: str, graph: Graph) -> ValidationReport:
+    """
+    Validate the shapes of a SHACL graph against the SHACL specification.
+
+    Args:
+        graph_name (str): Name of the graph.
+        graph (Graph): The SHACL shapes, without ontology graphs.
+    """
+    # pyshacl is slow to import and only needed here
+    from pyshacl import validate
+
+    conforms, results_graph, results_text = validate(
+        graph,
+        shacl_graph=SHACL_SHACL,
+        abort_on_first=True,
+        allow_infos=True,
+        allow_warnings=True,
+    )
+    return ValidationReport(graph_name, bool(conforms), results_graph, results_text)
@@ -0,0 +1,34 @@
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from shacl2md.utilities.manifest import MANIFEST_FILENAME
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+SHACLS = {
+    "a": os.path.join(DATA_DIR, "a.shacl.ttl"),
+    "b": os.path.join(DATA_DIR, "b.shacl.ttl"),
+}
+ONTOLOGY = os.path.join(DATA_DIR, "ontology.ttl")
+
+
+@pytest.fixture
+def logger() -> logging.Logger:
+    logger = logging.getLogger("shacl2md.tests")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+
+def read_pages(output_dir: str) -> dict:
+    """
+    Get the content of every generated file, by path relative to the output directory.
+    """
+    return {
+        str(path.relative_to(output_dir)): path.read_bytes()
+        for path in sorted(Path(output_dir).rglob("*"))
+        if path.is_file() and path.name != MANIFEST_FILENAME
+    }
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from shacl2md import generator as generator_module
+from shacl2md.generator import ShaclMarkdownGenerator
+
+from conftest import ONTOLOGY, SHACLS
+
+
+def test_agenerate_cancels_renders_on_error(tmp_path, monkeypatch, logger):
+    generator = ShaclMarkdownGenerator(
+        ["en", "nl"],
+        str(tmp_path),
+        ontology_graphs=[ONTOLOGY],
+        logger=logger,
+    )
+    cancelled = []
+
+    async def arender_diagrams(puml_paths):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(puml_paths)
+            raise
+
+    draft_page = generator_module.ShaclGraph.draft_page
+    drafts = []
+
+    def failing_draft_page(shacl_graph):
+        # the second page fails while the diagram of the first is rendering
+        if drafts:
+            raise RuntimeError("draft failed")
+        drafts.append(shacl_graph)
+        return draft_page(shacl_graph)
+
+    monkeypatch.setattr(generator, "arender_diagrams", arender_diagrams)
+    monkeypatch.setattr(generator_module.ShaclGraph, "draft_page", failing_draft_page)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="draft failed"):
+            await generator.agenerate(**SHACLS)
+        # no render is left behind
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(run()) == set()
+    assert len(cancelled) == 1
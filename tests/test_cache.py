@@ -0,0 +1,84 @@
+from pathlib import Path
+
+from rdflib.graph import Graph
+
+from shacl2md.generator import ShaclMarkdownGenerator
+from shacl2md.utilities.cache import ParseCache, ValidationCache
+
+from conftest import ONTOLOGY, SHACLS, read_pages
+
+
+def test_parse_cache_reads_url_sources(tmp_path):
+    parse_cache = ParseCache(str(tmp_path / "cache"))
+    g = parse_cache.load(Path(ONTOLOGY).as_uri(), Graph())
+
+    assert len(g) == len(Graph().parse(ONTOLOGY))
+    # only local files are cached
+    assert parse_cache.files() == []
+
+
+def generate(output_dir, ontology, cache_dir, logger, **options) -> dict:
+    ShaclMarkdownGenerator(
+        ["en"],
+        str(output_dir),
+        ontology_graphs=[ontology],
+        logger=logger,
+        cache_dir=str(cache_dir),
+        diagram_backend="none",
+    ).generate(a=SHACLS["a"], **options)
+    return read_pages(output_dir)
+
+
+def test_generate_with_url_sources(tmp_path, logger):
+    url = Path(ONTOLOGY).as_uri()
+    assert generate(tmp_path / "url", url, tmp_path / "cache", logger) == generate(
+        tmp_path / "file", ONTOLOGY, tmp_path / "cache", logger
+    )
+
+
+def test_incremental_generate_with_url_sources(tmp_path, logger):
+    url = Path(ONTOLOGY).as_uri()
+    output_dir = tmp_path / "url"
+    first = generate(output_dir, url, tmp_path / "cache", logger, incremental=True)
+    generator = ShaclMarkdownGenerator(
+        ["en"],
+        str(output_dir),
+        ontology_graphs=[url],
+        logger=logger,
+        cache_dir=str(tmp_path / "cache"),
+        diagram_backend="none",
+    )
+    generator.generate(a=SHACLS["a"], incremental=True)
+    # units depending on a URL cannot be fingerprinted, they are always generated
+    assert generator.skipped_units == set()
+    assert read_pages(output_dir) == first
+    assert first == generate(tmp_path / "file", ONTOLOGY, tmp_path / "cache", logger)
+
+
+def test_validation_cache_skips_url_sources(tmp_path):
+    validation_cache = ValidationCache(str(tmp_path / "cache"))
+
+    assert validation_cache.key([SHACLS["a"]]) is not None
+    assert validation_cache.key([Path(SHACLS["a"]).as_uri()]) is None
+    assert validation_cache.key([SHACLS["a"], Graph()]) is None
+
+
+def test_fingerprints_depend_on_the_plantuml_jar(tmp_path, logger):
+    jar_path = tmp_path / "plantuml.jar"
+
+    def fingerprints(jar: bytes, diagram_backend: str = "plantuml") -> dict:
+        jar_path.write_bytes(jar)
+        generator = ShaclMarkdownGenerator(
+            ["en"],
+            str(tmp_path / "docs"),
+            ontology_graphs=[ONTOLOGY],
+            logger=logger,
+            diagram_backend=diagram_backend,
+            plantuml_jar=str(jar_path),
+        )
+        return generator.unit_fingerprints(**SHACLS)
+
+    # a jar upgrade rebuilds the diagrams of an incremental build
+    assert fingerprints(b"v1") == fingerprints(b"v1")
+    assert fingerprints(b"v1") != fingerprints(b"v2")
+    assert fingerprints(b"v1", "none") == fingerprints(b"v2", "none")
@@ -0,0 +1,35 @@
+from shacl2md.generator import DIAGRAM_PLACEHOLDER, ShaclMarkdownGenerator
+
+from conftest import ONTOLOGY, SHACLS, read_pages
+
+
+def generate(output_dir, logger, diagram_backend: str) -> dict:
+    ShaclMarkdownGenerator(
+        ["en", "nl"],
+        str(output_dir),
+        ontology_graphs=[ONTOLOGY],
+        logger=logger,
+        diagram_backend=diagram_backend,
+    ).generate(**SHACLS)
+    files = read_pages(output_dir)
+    # no PlantUML diagram is written, nor rendered
+    assert not [path for path in files if path.endswith((".puml", ".svg"))]
+    pages = {
+        path: content.decode() for path, content in files.items() if path.endswith(".md")
+    }
+    assert len(pages) == len(SHACLS) * 2
+    return pages
+
+
+def test_mermaid_diagram(tmp_path, logger):
+    for page in generate(tmp_path, logger, "mermaid").values():
+        assert "```mermaid\nclassDiagram\n" in page
+        assert '<div id="zoom"' not in page
+        assert DIAGRAM_PLACEHOLDER not in page
+
+
+def test_no_diagram(tmp_path, logger):
+    for page in generate(tmp_path, logger, "none").values():
+        assert "```mermaid" not in page
+        assert '<div id="zoom"' not in page
+        assert DIAGRAM_PLACEHOLDER not in page
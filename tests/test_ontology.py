@@ -0,0 +1,54 @@
+import pickle
+
+from rdflib.graph import Graph
+
+from shacl2md.utilities.cache import ParseCache
+from shacl2md.utilities.ontology import RELEVANT_PREDICATES, PrunedGraph, referenced_iris
+
+from conftest import ONTOLOGY, SHACLS
+
+
+# predicates the generator does not read, dropped by a pruned load
+IRRELEVANT = """
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix dct: <http://purl.org/dc/terms/> .
+@prefix ex: <http://example.org/ns#> .
+
+ex:Agent owl:equivalentClass ex:Actor ; dct:source <http://example.org/source> .
+ex:Person dct:source <http://example.org/source> .
+"""
+
+
+def ontology_file(tmp_path) -> str:
+    path = tmp_path / "ontology.ttl"
+    with open(ONTOLOGY) as f:
+        path.write_text(f.read() + IRRELEVANT)
+    return str(path)
+
+
+def pruned(ontology: str, parse_cache=None) -> tuple:
+    g = PrunedGraph(bind_namespaces="none")
+    g.load(ontology, parse_cache)
+    shacl = Graph().parse(SHACLS["a"])
+    return g, g.prune(referenced_iris([shacl]))
+
+
+def test_pruned_load_caches_only_relevant_triples(tmp_path):
+    ontology = ontology_file(tmp_path)
+    uncached, counts = pruned(ontology)
+    parse_cache = ParseCache(str(tmp_path / "cache"))
+    cached, cached_counts = pruned(ontology, parse_cache)
+
+    assert set(cached) == set(uncached)
+    assert cached_counts == counts
+    [entry_path] = parse_cache.files()
+    with open(entry_path, "rb") as f:
+        _, triples, parsed = pickle.load(f)
+    assert {p for _, p, _ in triples} <= RELEVANT_PREDICATES
+    assert parsed == len(Graph().parse(ontology)) == len(triples) + 3
+    # the pruned load is not kept in memory
+    assert parse_cache.entries == {}
+
+    reloaded, reloaded_counts = pruned(ontology, ParseCache(str(tmp_path / "cache")))
+    assert set(reloaded) == set(uncached)
+    assert reloaded_counts == counts
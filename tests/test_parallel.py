@@ -0,0 +1,41 @@
+import multiprocessing
+
+import pytest
+
+from shacl2md.generator import ShaclMarkdownGenerator
+
+from conftest import ONTOLOGY, SHACLS, read_pages
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="the workers are forked",
+)
+@pytest.mark.parametrize("diagram_backend", ["mermaid", "none"])
+def test_parallel_generate_matches_sequential(tmp_path, logger, diagram_backend):
+    def generate(output_dir: str, jobs: int) -> ShaclMarkdownGenerator:
+        generator = ShaclMarkdownGenerator(
+            ["en", "nl"],
+            output_dir,
+            shacl_shacl_validation=True,
+            ontology_graphs=[ONTOLOGY],
+            logger=logger,
+            diagram_backend=diagram_backend,
+        )
+        generator.generate(jobs=jobs, **SHACLS)
+        return generator
+
+    sequential = generate(str(tmp_path / "sequential"), 1)
+    parallel = generate(str(tmp_path / "parallel"), 2)
+
+    pages = read_pages(tmp_path / "sequential")
+    assert pages
+    assert read_pages(tmp_path / "parallel") == pages
+    # the graphs validated in the workers are reported as well
+    assert {
+        name: report.conforms for name, report in parallel.validation_reports.items()
+    } == {
+        name: report.conforms
+        for name, report in sequential.validation_reports.items()
+    }
+    assert set(parallel.validation_reports) == set(SHACLS)
@@ -0,0 +1,41 @@
+import pytest
+
+import shacl2md
+from shacl2md.utilities import plantuml
+
+
+@pytest.fixture
+def missing_package_jar(tmp_path, monkeypatch):
+    jar_path = str(tmp_path / "plantuml.jar")
+    monkeypatch.setattr(plantuml, "_package_jar_path", lambda: jar_path)
+    monkeypatch.setattr(plantuml, "PLANTUML_JAR", None)
+
+    def download_jar(*args):
+        raise AssertionError("the jar is only downloaded explicitly")
+
+    monkeypatch.setattr(shacl2md, "download_jar", download_jar)
+    return jar_path
+
+
+def test_resolve_jar_does_not_download(missing_package_jar):
+    with pytest.raises(FileNotFoundError, match="shacl2md download-plantuml-jar"):
+        plantuml.resolve_jar()
+
+
+def test_resolve_configured_jar(tmp_path):
+    jar_path = tmp_path / "plantuml.jar"
+    with pytest.raises(FileNotFoundError, match="not found"):
+        plantuml.resolve_jar(str(jar_path))
+
+    jar_path.write_bytes(b"")
+    assert plantuml.resolve_jar(str(jar_path)) == str(jar_path)
+
+
+def test_render_without_jar(tmp_path, missing_package_jar, logger):
+    puml_path = str(tmp_path / "graph-diagram.puml")
+    with open(puml_path, "w") as f:
+        f.write("@startuml\n@enduml\n")
+
+    errors = plantuml.render_svgs([puml_path], logger)
+
+    assert "shacl2md download-plantuml-jar" in errors[puml_path]
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import threading
+
+from shacl2md.utilities.profile import Profiler
+
+
+def test_spans_nest():
+    profiler = Profiler(record=True)
+    with profiler.span("outer") as outer:
+        with profiler.span("inner") as inner:
+            pass
+    with profiler.span("next") as next_span:
+        pass
+
+    assert inner.parent == outer.id
+    assert outer.parent is None
+    assert next_span.parent is None
+    assert [span.name for span in profiler.spans] == ["inner", "outer", "next"]
+
+
+def test_spans_of_concurrent_coroutines():
+    profiler = Profiler(record=True)
+
+    async def page(name: str, delay: float):
+        with profiler.span("page", graph=name) as page_span:
+            await asyncio.sleep(delay)
+            with profiler.span("render", graph=name) as render_span:
+                await asyncio.sleep(delay)
+        return page_span, render_span
+
+    async def build():
+        with profiler.span("generate") as generate_span:
+            # the spans of both pages are open at the same time, and end out of order
+            pages = await asyncio.gather(page("a", 0.02), page("b", 0.01))
+        return generate_span, pages
+
+    generate_span, pages = asyncio.run(build())
+
+    for page_span, render_span in pages:
+        assert page_span.parent == generate_span.id
+        assert render_span.parent == page_span.id
+        assert render_span.tags == page_span.tags
+    with profiler.span("write") as write_span:
+        pass
+    assert write_span.parent is None
+
+
+def test_spans_of_threads():
+    profiler = Profiler(record=True)
+    spans = {}
+
+    def work():
+        with profiler.span("thread") as span:
+            spans["thread"] = span
+
+    with profiler.span("main") as main_span:
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert main_span.parent is None
+    # a thread does not see the spans opened by another thread
+    assert spans["thread"].parent is None
+
+
+def test_merge_nests_worker_spans():
+    profiler = Profiler(record=True)
+    worker = profiler.fork()
+    with worker.span("page"):
+        with worker.span("render"):
+            pass
+    with profiler.span("generate") as generate_span:
+        profiler.merge([span.to_dict() for span in worker.spans])
+
+    render, page, generate = profiler.spans
+    assert page.parent == generate_span.id
+    assert render.parent == page.id
+    assert generate is generate_span
+
+
+def test_write_to_bare_filename(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    profiler = Profiler(record=True)
+    with profiler.span("generate"):
+        pass
+
+    profiler.write("profile.json")
+
+    profile = json.loads((tmp_path / "profile.json").read_text())
+    assert [span["name"] for span in profile["spans"]] == ["generate"]
+    assert [p.name for p in tmp_path.iterdir()] == ["profile.json"]
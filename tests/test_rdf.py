@@ -0,0 +1,30 @@
+from shacl2md.generator import ShaclMarkdownGenerator
+from shacl2md.utilities.rdf import ClassRegistry
+
+from conftest import ONTOLOGY, SHACLS
+
+
+def test_class_registry_forgets_pages():
+    registry = ClassRegistry()
+    for key in [("a", "x", "en"), ("a", "x", "nl"), ("a", "y", "en"), ("b", "x", "en")]:
+        registry.get(key, object)
+
+    registry.forget("a", "en")
+    assert set(registry.classes) == {("a", "x", "nl"), ("b", "x", "en")}
+    registry.forget("a")
+    assert set(registry.classes) == {("b", "x", "en")}
+
+
+def test_class_registry_is_empty_after_generate(tmp_path, logger):
+    generator = ShaclMarkdownGenerator(
+        ["en", "nl"],
+        str(tmp_path),
+        ontology_graphs=[ONTOLOGY],
+        logger=logger,
+        diagram_backend="none",
+    )
+    generator.generate(**SHACLS)
+
+    # the superclasses are only shared within the page of a graph and language
+    assert generator.class_registry.classes == {}
+    assert generator.class_registry.misses > 0
@@ -0,0 +1,139 @@
+from rdflib.graph import Graph
+from rdflib.namespace import RDF, RDFS, SKOS, Namespace
+
+from shacl2md.generator import ShaclMarkdownGenerator
+from shacl2md.utilities.shapes import SHACL, ShapeIndex
+
+# The queries the shape index replaced, to check it returns the same shapes
+LEGACY_PROPERTIES = """
+SELECT DISTINCT ?shape ?iri ?min ?max ?kind ?uniqueLang
+WHERE {
+    ?subjectclassNode sh:targetClass ?targetClass .
+    ?subjectclassNode sh:or*/rdf:rest*/rdf:first*/sh:property ?shape .
+    ?shape sh:path ?iri.
+    OPTIONAL {?shape sh:minCount ?min}
+    OPTIONAL {?shape sh:maxCount ?max}
+    OPTIONAL {?shape sh:uniqueLang ?uniqueLang}
+    OPTIONAL {?shape sh:nodeKind ?kind}
+}
+"""
+
+LEGACY_DATATYPES = """
+SELECT DISTINCT ?iri ?type
+WHERE {
+    {
+        ?shape sh:or*/rdf:rest*/rdf:first*/sh:datatype ?iri .
+        BIND("datatype" AS ?type)
+    } UNION {
+        ?shape sh:or*/rdf:rest*/rdf:first*/sh:class ?iri .
+        BIND("class" AS ?type)
+    }
+}
+"""
+
+LEGACY_VALUES = """
+SELECT ?iri
+WHERE {
+    ?shape sh:in ?n .
+    OPTIONAL{
+        ?n rdf:rest*/rdf:first ?iri
+    }
+}
+"""
+
+NAMESPACES = {"sh": SHACL, "rdf": RDF, "rdfs": RDFS, "skos": SKOS}
+
+EX = Namespace("http://example.org/")
+
+SHAPES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix dct: <http://purl.org/dc/terms/> .
+@prefix ex: <http://example.org/> .
+
+ex: a owl:Ontology ; dct:title "Edge cases"@en .
+
+ex:Thing a rdfs:Class ; rdfs:label "Thing"@en .
+ex:Unlabelled a rdfs:Class ; rdfs:subClassOf ex:Thing .
+
+ex:ThingShape a sh:NodeShape ;
+    sh:targetClass ex:Thing ;
+    sh:property ex:emptyIn, ex:someIn, ex:twoPaths, ex:unlabelled ;
+    sh:or ( [ sh:property ex:alternative ] [ sh:property ex:someIn ] ) .
+
+ex:UnlabelledShape a sh:NodeShape ;
+    sh:targetClass ex:Unlabelled ;
+    sh:property [ sh:path ex:blank ; sh:class ex:Thing ] .
+
+ex:emptyIn sh:path ex:status ; sh:in () ; sh:maxCount 1 .
+ex:someIn sh:path ex:color ; sh:in ( ex:red ex:green ex:blue ) .
+ex:twoPaths sh:path ex:name, ex:title ;
+    sh:datatype xsd:string ;
+    sh:minCount 1 ;
+    sh:uniqueLang true .
+ex:unlabelled sh:path ex:other ;
+    sh:nodeKind sh:IRI ;
+    sh:or ( [ sh:datatype xsd:date ] [ sh:class ex:Unlabelled ] ) .
+ex:alternative sh:path ex:alternative .
+"""
+
+
+def shapes_graph() -> Graph:
+    return Graph().parse(data=SHAPES, format="turtle")
+
+
+def test_shape_index_matches_legacy_queries():
+    g = shapes_graph()
+    index = ShapeIndex(g)
+
+    for target_class in (EX.Thing, EX.Unlabelled):
+        property_shapes = index.properties[target_class]
+        rows = g.query(
+            LEGACY_PROPERTIES, initNs=NAMESPACES, initBindings={"targetClass": target_class}
+        )
+        assert {
+            (p.shape, p.iri, p.min, p.max, p.kind, p.uniqueLang) for p in property_shapes
+        } == {tuple(row) for row in rows}
+
+        for p in property_shapes:
+            rows = g.query(
+                LEGACY_DATATYPES, initNs=NAMESPACES, initBindings={"shape": p.shape}
+            )
+            assert set(p.datatypes) == {(row.iri, str(row.type)) for row in rows}
+
+            rows = g.query(LEGACY_VALUES, initNs=NAMESPACES, initBindings={"shape": p.shape})
+            # an empty sh:in matched with an unbound value, it has no values
+            assert sorted(p.values) == sorted(row.iri for row in rows if row.iri is not None)
+
+
+def test_empty_sh_in_has_no_values():
+    index = ShapeIndex(shapes_graph())
+    values = {p.iri: p.values for p in index.properties[EX.Thing]}
+
+    assert values[EX.status] == []
+    assert values[EX.color] == [EX.red, EX.green, EX.blue]
+
+
+def test_shapes_with_several_paths():
+    index = ShapeIndex(shapes_graph())
+    paths = [p.iri for p in index.properties[EX.Thing] if p.shape == EX.twoPaths]
+
+    assert sorted(paths) == [EX.name, EX.title]
+
+
+def test_page_of_edge_cases(tmp_path, logger):
+    shacl_path = tmp_path / "edge.shacl.ttl"
+    shacl_path.write_text(SHAPES)
+    ShaclMarkdownGenerator(
+        ["en"], str(tmp_path / "docs"), logger=logger, diagram_backend="none"
+    ).generate(edge=str(shacl_path))
+    page = (tmp_path / "docs" / "edge" / "en" / "index.md").read_text()
+
+    # the classes and properties without labels are documented by their IRI
+    assert "(http://example.org/Unlabelled)" in page
+    assert "(http://example.org/other)" in page
+    # the empty sh:in has no possible values
+    assert "(None)" not in page
+    assert page.count("Possible values") == 1
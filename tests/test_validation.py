@@ -0,0 +1,24 @@
+import json
+
+from shacl2md.generator import ShaclMarkdownGenerator
+
+from conftest import ONTOLOGY, SHACLS
+
+
+def test_write_validation_report_to_bare_filename(tmp_path, monkeypatch, logger):
+    monkeypatch.chdir(tmp_path)
+    generator = ShaclMarkdownGenerator(
+        ["en"],
+        "docs",
+        shacl_shacl_validation=True,
+        ontology_graphs=[ONTOLOGY],
+        logger=logger,
+        diagram_backend="none",
+    )
+    generator.generate(**SHACLS)
+
+    generator.write_validation_report("report.json")
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert set(report["graphs"]) == set(SHACLS)
+    assert report["conforms"] == all(g["conforms"] for g in report["graphs"].values())
@@ -0,0 +1,67 @@
+import os
+import shutil
+
+from shacl2md import generator as generator_module
+from shacl2md.generator import ShaclMarkdownGenerator
+
+from conftest import ONTOLOGY, SHACLS
+
+EXTRA_ONTOLOGY = """
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/ns#> .
+
+ex:homepage rdfs:label "{label}"@nl .
+"""
+
+
+def touch(path: str, step: int):
+    # a distinct modification time per step, whatever the clock resolution
+    mtime = os.stat(path).st_mtime_ns + step * 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_watch_keeps_the_ontology_after_a_parse_error(tmp_path, monkeypatch, logger):
+    ontology = str(tmp_path / "ontology.ttl")
+    shutil.copy(ONTOLOGY, ontology)
+    extra = tmp_path / "extra.ttl"
+    extra.write_text(EXTRA_ONTOLOGY.format(label="startpagina"))
+    page = tmp_path / "docs" / "a" / "nl" / "index.md"
+    generator = ShaclMarkdownGenerator(
+        ["en", "nl"],
+        str(tmp_path / "docs"),
+        ontology_graphs=[ontology, str(extra)],
+        logger=logger,
+        diagram_backend="none",
+    )
+    sources = list(generator.ontology_sources)
+    states = []
+
+    def edit(step: int):
+        if step == 0:
+            assert "startpagina" in page.read_text()
+            states.append((list(generator.ontology_sources), generator.ontology_graph))
+            # the first ontology file is saved halfway through an edit
+            with open(ontology, "a") as f:
+                f.write('ex:broken rdfs:label "unterminated\n')
+            touch(ontology, 1)
+        elif step == 1:
+            states.append((list(generator.ontology_sources), generator.ontology_graph))
+            shutil.copy(ONTOLOGY, ontology)
+            extra.write_text(EXTRA_ONTOLOGY.format(label="webstek"))
+            touch(ontology, 2)
+            touch(str(extra), 2)
+        else:
+            raise KeyboardInterrupt
+
+    steps = iter(range(3))
+    monkeypatch.setattr(generator_module.time, "sleep", lambda _: edit(next(steps)))
+    generator.watch(a=SHACLS["a"])
+
+    # the rebuild failed on the parse error, the ontology was kept whole
+    (sources_before, graph_before), (sources_after, graph_after) = states
+    assert sources_before == sources_after == sources
+    assert graph_after is graph_before
+    # the files after the broken one are still watched and loaded
+    assert generator.ontology_sources == sources
+    assert "webstek" in page.read_text()
+    assert "startpagina" not in page.read_text()